@@ -1,21 +1,21 @@
-from fastapi import APIRouter, HTTPException, Response, Request
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
-from services.prompt_engine import PromptEngine
+from services.prompt_engine import get_prompt_engine
 from services.ppt_builder import PPTBuilder
-from services.slide_schema import Deck
 from services.streaming_service import streaming_service
 from core.logger import get_logger
 from core.config import settings
 import threading
 import uuid
 import re
-import uuid
-import threading
-import re
 
 router = APIRouter()
 logger = get_logger("api.routes")
 
+# Filename sanitizers for create_custom_filename
+_USERNAME_STRIP_RE = re.compile(r'[^\w\-_]')
+_TOPIC_STRIP_RE = re.compile(r'[^\w\-_\s]')
+
 # In-memory job store (for MVP; use Redis for prod)
 jobs = {}
 jobs_lock = threading.Lock()
@@ -26,31 +26,33 @@ class JobStatus:
     DONE = "done"
     ERROR = "error"
 
-def job_worker(job_id, topic, username="anonymous", use_template=True, num_slides=8, include_images=True, include_diagrams=True, theme="professional"):
+def job_worker(job_id, topic, username="anonymous", use_template=True, num_slides=8, include_images=True, include_diagrams=True, theme="professional", regenerate=False):
     with jobs_lock:
         jobs[job_id]["status"] = JobStatus.RUNNING
     
-    # Emit job started event
-    streaming_service.emit_event(job_id, "job_started", {
-        "message": f"Starting PPT generation for '{topic}'",
-        "topic": topic,
-        "username": username,
-        "num_slides": num_slides,
-        "include_images": include_images,
-        "include_diagrams": include_diagrams,
-        "theme": theme
-    })
-    
-    try:
+    # Emit job started event, together with the first step so watchers are woken once
+    streaming_service.emit_events(job_id, [
+        ("job_started", {
+            "message": f"Starting PPT generation for '{topic}'",
+            "topic": topic,
+            "username": username,
+            "num_slides": num_slides,
+            "include_images": include_images,
+            "include_diagrams": include_diagrams,
+            "theme": theme
+        }),
         # Step 1: Generate slides with LLM
-        streaming_service.emit_event(job_id, "llm_processing", {
+        ("llm_processing", {
             "message": "Calling AI to generate slide content...",
             "step": "content_generation"
         })
-        
-        engine = PromptEngine()
+    ])
+    
+    pptx_stream = None
+    try:
+        engine = get_prompt_engine()
         logger.info(f"Calling LLM for topic: {topic} (user: {username})")
-        deck = engine.generate_slides(topic, num_slides=num_slides, include_images=include_images, include_diagrams=include_diagrams)
+        deck = engine.generate_slides(topic, num_slides=num_slides, include_images=include_images, include_diagrams=include_diagrams, job_id=job_id, regenerate=regenerate)
         logger.info(f"Deck object created: {deck}")
         
         if not deck.slides:
@@ -80,16 +82,21 @@ def job_worker(job_id, topic, username="anonymous", use_template=True, num_slide
         pptx_stream = builder.build(deck, use_template=use_template, job_id=job_id)
         logger.info(f"PPTX built in memory")
         
-        streaming_service.emit_event(job_id, "pptx_built", {
-            "message": "PowerPoint presentation created successfully",
-            "file_size": len(pptx_stream.getvalue())
-        })
-        
-        # Step 3: Upload to cloud storage
-        streaming_service.emit_event(job_id, "uploading", {
-            "message": "Uploading presentation to cloud storage...",
-            "step": "cloud_upload"
-        })
+        # Measure the spooled stream without reading it into memory
+        pptx_stream.seek(0, 2)
+        file_size = pptx_stream.tell()
+        pptx_stream.seek(0)
+        streaming_service.emit_events(job_id, [
+            ("pptx_built", {
+                "message": "PowerPoint presentation created successfully",
+                "file_size": file_size
+            }),
+            # Step 3: Upload to cloud storage
+            ("uploading", {
+                "message": "Uploading presentation to cloud storage...",
+                "step": "cloud_upload"
+            })
+        ])
         
         # Upload to GoFile - this is now the primary storage
         online_url = None
@@ -162,16 +169,18 @@ def job_worker(job_id, topic, username="anonymous", use_template=True, num_slide
             jobs[job_id]["status"] = JobStatus.ERROR
             jobs[job_id]["error"] = str(e)
         logger.error(f"Job {job_id} failed: {e}")
+    finally:
+        # Large decks spill to a temp file; release it rather than wait for GC
+        if pptx_stream is not None:
+            pptx_stream.close()
 
 def create_custom_filename(username: str, topic: str) -> str:
     """Create a custom filename using format: [username]_[topic_name].pptx"""
-    import re
-    
     # Clean username - remove special characters and spaces
-    clean_username = re.sub(r'[^\w\-_]', '', username.replace(' ', '_'))
+    clean_username = _USERNAME_STRIP_RE.sub('', username.replace(' ', '_'))
     
     # Clean topic - remove special characters, replace spaces with underscores
-    clean_topic = re.sub(r'[^\w\-_\s]', '', topic).replace(' ', '_')
+    clean_topic = _TOPIC_STRIP_RE.sub('', topic).replace(' ', '_')
     
     # Limit length to avoid very long filenames
     clean_username = clean_username[:20] if clean_username else "anonymous"
@@ -192,6 +201,7 @@ async def generate_ppt(request: Request):
     include_images = data.get("include_images", True)
     include_diagrams = data.get("include_diagrams", True)
     theme = data.get("theme", "professional")
+    regenerate = data.get("regenerate", False)  # Skip any cached deck for this topic
     
     if not topic or not isinstance(topic, str):
         logger.error(f"Invalid topic received: {topic}")
@@ -199,15 +209,17 @@ async def generate_ppt(request: Request):
     
     if sync:
         # Synchronous processing for debugging
+        pptx_stream = None
         try:
-            engine = PromptEngine()
+            engine = get_prompt_engine()
             logger.info(f"Calling LLM for topic: {topic} (user: {username})")
-            deck = engine.generate_slides(topic, num_slides=num_slides, include_images=include_images, include_diagrams=include_diagrams)
+            deck = await engine.agenerate_slides(topic, num_slides=num_slides, include_images=include_images, include_diagrams=include_diagrams, regenerate=regenerate)
             logger.info(f"Deck object created: {deck}")
             if not deck.slides:
                 logger.error(f"Deck is empty for topic: {topic}")
             builder = PPTBuilder(theme=theme)
-            pptx_stream = builder.build(deck, use_template=use_template)
+            # Build off the event loop so image downloads don't stall other requests
+            pptx_stream = await builder.abuild(deck, use_template=use_template)
             logger.info(f"PPTX built in memory")
             
             # Create response without local download URL
@@ -244,6 +256,9 @@ async def generate_ppt(request: Request):
         except Exception as e:
             logger.error(f"Failed to generate PPT: {e}")
             raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            if pptx_stream is not None:
+                pptx_stream.close()
     else:
         # Async job worker (production)
         job_id = str(uuid.uuid4())
@@ -267,7 +282,7 @@ async def generate_ppt(request: Request):
         }
         with jobs_lock:
             jobs[job_id] = {"status": JobStatus.PENDING, "online_url": None, "error": None, "stream_id": stream_id}
-        threading.Thread(target=job_worker, args=(job_id, topic, username, use_template, num_slides, include_images, include_diagrams, theme), daemon=True).start()
+        threading.Thread(target=job_worker, args=(job_id, topic, username, use_template, num_slides, include_images, include_diagrams, theme, regenerate), daemon=True).start()
         logger.info(f"Enqueued job {job_id} for topic '{topic}' by user '{username}' (use_template={use_template}, num_slides={num_slides})")
         return {
             "job_id": job_id,
@@ -285,12 +300,13 @@ def get_status(job_id: str):
         if not job:
             logger.error(f"Status check for missing job_id: {job_id}")
             raise HTTPException(status_code=404, detail="Job not found")
-        resp = {"status": job["status"]}
-        if job["status"] == JobStatus.DONE:
+        status = job["status"]
+        resp = {"status": status}
+        if status == JobStatus.DONE:
             # Only include online URL now
             if "online_url" in job:
                 resp["online_url"] = job["online_url"]
-        if job["status"] == JobStatus.ERROR:
+        elif status == JobStatus.ERROR:
             resp["error"] = job["error"]
         # Include stream ID if available
         if "stream_id" in job:
@@ -5,6 +5,9 @@ class Settings(BaseSettings):
     # Gemini API settings
     gemini_api_key: str = ""
     gemini_model: str = "gemini-2.0-flash"
+    deck_cache_enabled: bool = False  # Opt-in: reuse generated decks for identical requests
+    deck_cache_ttl: int = 7 * 24 * 3600  # seconds
+    deck_cache_max_entries: int = 256  # Oldest disk entries beyond this are evicted
     
     # Unsplash API settings
     unsplash_access_key: Optional[str] = None
@@ -18,6 +21,9 @@ class Settings(BaseSettings):
     # Image settings
     default_image_size: str = "800x600"
     enable_images: bool = True
+    image_cache_enabled: bool = True
+    image_cache_dir: Optional[str] = None  # Defaults to ~/.cache/ppt_builder/images
+    image_cache_max_mb: int = 500
     
     # Server settings
     host: str = "0.0.0.0"
@@ -1,6 +1,7 @@
 import logging
 import sys
 import json
+from core.config import settings
 
 class JsonFormatter(logging.Formatter):
     def format(self, record):
@@ -20,5 +21,8 @@ def get_logger(name: str = "cursor"):
         handler = logging.StreamHandler(sys.stdout)
         handler.setFormatter(JsonFormatter())
         logger.addHandler(handler)
-    logger.setLevel(logging.INFO)
+    logger.setLevel(logging.DEBUG if settings.debug else logging.INFO)
     return logger
+
+# Per-request connection chatter from urllib3 is only useful when debugging
+logging.getLogger("urllib3").setLevel(logging.DEBUG if settings.debug else logging.WARNING)
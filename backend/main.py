@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes import router
@@ -14,11 +15,16 @@ logger = get_logger()
 # Initialize services on startup
 @app.on_event("startup")
 async def startup_event():
+    # Reap SSE streams whose clients went away without the job finishing
+    from services.streaming_service import streaming_service
+    app.state.stream_reaper = asyncio.create_task(streaming_service.run_reaper())
+    
     # Initialize GoFile service if enabled
     if settings.gofile_enabled:
         try:
             from services.gofile_service import gofile_service
-            connection_result = gofile_service.test_connection()
+            # Network round trip; keep it off the event loop
+            connection_result = await asyncio.to_thread(gofile_service.test_connection)
             if connection_result["success"]:
                 logger.info("GoFile service initialized successfully")
                 if "account_id" in connection_result:
@@ -4,12 +4,46 @@ from pptx.enum.shapes import MSO_SHAPE
 from pptx.dml.color import RGBColor
 from services.slide_schema import Slide
 import re
-import requests
 from io import BytesIO
 from core.logger import get_logger
 
 logger = get_logger("academic_layouts")
 
+# Equation indicators counted by EquationLayout._is_equation_line
+_EQUATION_MARKERS = (
+    '=', '+', '-', '×', '÷', '/', '*', '^',
+    '$', '\\frac', '\\sum', '\\int', '\\cdot',
+    '_', '{', '}', '\\left', '\\right', '\\prod',
+    '\\lim', '\\alpha', '\\beta', '\\gamma', '\\theta',
+    '\\lambda', '\\delta', '\\sigma', '\\omega'
+)
+
+# Specific patterns that indicate equations, folded into one regex so a line
+# is scanned once
+_EQUATION_LINE_RE = re.compile('|'.join(f'(?:{p})' for p in [
+    r'\$.+\$',                    # LaTeX equation delimiters
+    r'=.+[a-zA-Z0-9]',            # Equations with = sign
+    r'\(.+\).+\(.+\)',            # Multiple parenthetical expressions
+    r'\w+_{[a-zA-Z0-9]+}',        # Subscript notation
+    r'\w+\^\{[a-zA-Z0-9]+\}',     # Superscript notation
+    r'\\\w+\{.+\}',               # LaTeX command with arguments
+    r'\s\\sum|\s\\prod|\s\\int',  # Math operators with space before
+    r'\)\s*=|\}\s*=',             # Right parenthesis or brace followed by =
+]))
+
+
+def find_content_shape(pptx_slide, title_shape):
+    """Return the slide's body text shape, preferring the content placeholder (idx 1)"""
+    try:
+        return pptx_slide.placeholders[1]
+    except KeyError:
+        # Layout without a body placeholder: fall back to scanning for any
+        # other text shape
+        for shape in pptx_slide.shapes:
+            if shape.has_text_frame and shape != title_shape:
+                return shape
+    return None
+
 class EquationLayout:
     """Layout specifically designed for mathematical equations"""
     
@@ -88,10 +122,11 @@ class EquationLayout:
         # Add image if available (e.g. graph or plot)
         if slide_data.image_url:
             try:
-                response = requests.get(slide_data.image_url, timeout=10)
-                response.raise_for_status()
-                
-                img_stream = BytesIO(response.content)
+                # Deferred: ppt_builder imports this module. Its fetcher streams the
+                # body through the shared keep-alive session and disk cache instead
+                # of buffering response.content
+                from services.ppt_builder import _fetch_image_bytes
+                img_stream = BytesIO(_fetch_image_bytes(slide_data.image_url))
                 pptx_slide.shapes.add_picture(
                     img_stream, 
                     Inches(5), 
@@ -274,32 +309,11 @@ class EquationLayout:
     
     def _is_equation_line(self, text):
         """Check if this line appears to be an equation"""
-        # Check for equation indicators
-        equation_markers = [
-            '=', '+', '-', '×', '÷', '/', '*', '^', 
-            '$', '\\frac', '\\sum', '\\int', '\\cdot',
-            '_', '{', '}', '\\left', '\\right', '\\prod',
-            '\\lim', '\\alpha', '\\beta', '\\gamma', '\\theta',
-            '\\lambda', '\\delta', '\\sigma', '\\omega'
-        ]
-        
         # Count mathematical symbols
-        math_symbol_count = sum(text.count(marker) for marker in equation_markers)
-        
-        # Check for specific patterns that indicate equations
-        equation_patterns = [
-            r'\$.+\$',                   # LaTeX equation delimiters
-            r'=.+[a-zA-Z0-9]',           # Equations with = sign
-            r'\(.+\).+\(.+\)',           # Multiple parenthetical expressions
-            r'\w+_{[a-zA-Z0-9]+}',       # Subscript notation
-            r'\w+\^\{[a-zA-Z0-9]+\}',    # Superscript notation
-            r'\\\w+\{.+\}',              # LaTeX command with arguments
-            r'\s\\sum|\s\\prod|\s\\int', # Math operators with space before
-            r'\)\s*=|\}\s*=',            # Right parenthesis or brace followed by =
-        ]
+        math_symbol_count = sum(text.count(marker) for marker in _EQUATION_MARKERS)
         
         # Check if any equation patterns match
-        has_equation_pattern = any(re.search(pattern, text) for pattern in equation_patterns)
+        has_equation_pattern = _EQUATION_LINE_RE.search(text) is not None
         
         # If we have significant math symbols or a matching pattern
         return (math_symbol_count >= 2 or 
@@ -501,11 +515,7 @@ class TextDenseLayout:
         title_shape.text_frame.paragraphs[0].font.size = Pt(32)
         
         # Use smaller font and tighter spacing for dense text
-        content_shape = None
-        for shape in pptx_slide.shapes:
-            if shape.has_text_frame and shape != title_shape:
-                content_shape = shape
-                break
+        content_shape = find_content_shape(pptx_slide, title_shape)
                 
         if not content_shape:
             content_shape = pptx_slide.shapes.add_textbox(
@@ -555,11 +565,7 @@ class TextSparseLayout:
         title_shape.text_frame.paragraphs[0].font.bold = True
         title_shape.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
         
-        content_shape = None
-        for shape in pptx_slide.shapes:
-            if shape.has_text_frame and shape != title_shape:
-                content_shape = shape
-                break
+        content_shape = find_content_shape(pptx_slide, title_shape)
                 
         if not content_shape:
             content_shape = pptx_slide.shapes.add_textbox(
@@ -1,13 +1,59 @@
 import os
+import uuid
+import mimetypes
 import requests
-import logging
-from typing import Optional, Dict, Any
-from io import BytesIO
+from typing import Optional, Dict, Any, BinaryIO
 from core.config import settings
 from core.logger import get_logger
 
 logger = get_logger("gofile_service")
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+PPTX_CONTENT_TYPE = (
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+)
+
+
+class MultipartFileBody:
+    """Single-file multipart/form-data body that streams the file in chunks
+
+    requests' files= builds the whole encoded body in memory; this yields it
+    piecewise instead, and defines __len__ so requests still sends a Content-Length
+    header.
+    """
+
+    def __init__(self, field_name: str, filename: str, file_stream: BinaryIO,
+                 content_type: str, fields: Optional[Dict[str, str]] = None):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        quoted_name = filename.replace('"', '%22')
+        head = "".join(
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+            for name, value in (fields or {}).items()
+        )
+        head += (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field_name}"; '
+            f'filename="{quoted_name}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        )
+        self._head = head.encode('utf-8')
+        self._tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        self._stream = file_stream
+        file_stream.seek(0, 2)
+        self._size = file_stream.tell()
+
+    def __len__(self):
+        return len(self._head) + self._size + len(self._tail)
+
+    def __iter__(self):
+        self._stream.seek(0)
+        yield self._head
+        while chunk := self._stream.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
+        yield self._tail
+
 class GoFileService:
     """Service for interacting with GoFile.io API to store files online"""
     
@@ -15,11 +61,16 @@ class GoFileService:
         self.base_url = "https://api.gofile.io"
         self.api_token = settings.gofile_api_token
         self.folder_id = settings.gofile_folder_id  # Optional: default folder to upload to
+        self.upload_url = "https://upload.gofile.io/uploadfile"
+        # Successful test_connection result, reused by later callers
+        self._connection_ok = None
+        # Reuse TLS connections across the server lookup, upload and follow-up API calls
+        self.session = requests.Session()
     
     def get_best_server(self) -> Dict[str, Any]:
         """Get the best server for uploading files"""
         try:
-            response = requests.get(f"{self.base_url}/getServer")
+            response = self.session.get(f"{self.base_url}/getServer")
             if response.status_code == 200:
                 result = response.json()
                 if result.get("status") == "ok":
@@ -58,7 +109,7 @@ class GoFileService:
             logger.info(f"Uploading file to GoFile: {file_path} as '{upload_filename}'")
             
             # Use the correct upload endpoint
-            upload_url = "https://upload.gofile.io/uploadfile"
+            upload_url = self.upload_url
             
             # Prepare headers with token if available
             headers = {}
@@ -70,7 +121,6 @@ class GoFileService:
             
             # Prepare files and data
             with open(file_path, 'rb') as f:
-                files = {'file': (upload_filename, f)}
                 data = {}
                 
                 # Add folder ID if specified and we have API token
@@ -86,13 +136,12 @@ class GoFileService:
                 logger.debug(f"Upload URL: {upload_url}")
                 logger.debug(f"Data parameters: {data}")
                 
-                # Upload the file
-                response = requests.post(
-                    upload_url,
-                    headers=headers if headers else None,
-                    files=files,
-                    data=data if data else None
-                )
+                # Upload the file straight from disk rather than encoding it in memory
+                content_type, _ = mimetypes.guess_type(upload_filename)
+                content_type = content_type or 'application/octet-stream'
+                body = MultipartFileBody('file', upload_filename, f, content_type, data)
+                headers["Content-Type"] = body.content_type
+                response = self.session.post(upload_url, headers=headers, data=body)
             
             # Check if the request was successful
             if response.status_code == 200:
@@ -131,12 +180,13 @@ class GoFileService:
             logger.error(f"Error uploading file to GoFile: {e}")
             return {"success": False, "error": str(e)}
     
-    def upload_stream(self, file_stream: BytesIO, filename: str, folder_id: Optional[str] = None) -> Dict[str, Any]:
+    def upload_stream(self, file_stream: BinaryIO, filename: str,
+                      folder_id: Optional[str] = None) -> Dict[str, Any]:
         """
-        Upload a file stream (BytesIO) to GoFile.io
+        Upload a file stream (BytesIO or spooled temp file) to GoFile.io
         
         Args:
-            file_stream: BytesIO stream containing the file data
+            file_stream: Binary stream containing the file data
             filename: Name to use for the uploaded file
             folder_id: Optional folder ID to upload to (if None, uses default or creates new)
             
@@ -147,7 +197,7 @@ class GoFileService:
             logger.info(f"Uploading stream to GoFile as '{filename}'")
             
             # Use the correct upload endpoint
-            upload_url = "https://upload.gofile.io/uploadfile"
+            upload_url = self.upload_url
             
             # Prepare headers with token if available
             headers = {}
@@ -157,9 +207,6 @@ class GoFileService:
             else:
                 logger.warning("No API token configured - using guest upload")
             
-            # Prepare files and data
-            file_stream.seek(0)  # Ensure we're at the beginning of the stream
-            files = {'file': (filename, file_stream, 'application/vnd.openxmlformats-officedocument.presentationml.presentation')}
             data = {}
             
             # Add folder ID if specified and we have API token
@@ -175,13 +222,13 @@ class GoFileService:
             logger.debug(f"Upload URL: {upload_url}")
             logger.debug(f"Data parameters: {data}")
             
-            # Upload the stream
-            response = requests.post(
-                upload_url,
-                headers=headers if headers else None,
-                files=files,
-                data=data if data else None
+            # Upload the stream chunk by chunk rather than encoding the whole deck in
+            # memory
+            body = MultipartFileBody(
+                'file', filename, file_stream, PPTX_CONTENT_TYPE, data
             )
+            headers["Content-Type"] = body.content_type
+            response = self.session.post(upload_url, headers=headers, data=body)
             
             # Check if the request was successful
             if response.status_code == 200:
@@ -245,7 +292,7 @@ class GoFileService:
                 "folderName": folder_name
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/contents/createFolder",
                 headers=headers,
                 json=data
@@ -291,7 +338,7 @@ class GoFileService:
         try:
             headers = {"Authorization": f"Bearer {self.api_token}"}
             
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/accounts/getid",
                 headers=headers
             )
@@ -326,13 +373,22 @@ class GoFileService:
         Test the connection to GoFile API
         
         Returns:
-            Dict with connection test results
+            Dict with connection test results; a successful result is cached
+            for the process
         """
+        if self._connection_ok is None:
+            result = self._check_connection()
+            if not result.get("success"):
+                return result
+            self._connection_ok = result
+        return self._connection_ok
+
+    def _check_connection(self) -> Dict[str, Any]:
         if not self.api_token:
             logger.warning("No GoFile API token configured. Will use guest upload.")
             # Test guest upload capability
             try:
-                response = requests.get(self.upload_url)
+                response = self.session.get(self.upload_url, timeout=10)
                 if response.status_code in (200, 405):  # 405 is expected for GET on POST endpoint
                     return {"success": True, "message": "Guest upload should be available"}
                 else:
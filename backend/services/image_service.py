@@ -1,12 +1,21 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 from typing import Optional, List
-import os
+import threading
+from collections import OrderedDict
 from urllib.parse import quote
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# (topic, slide title) -> Unsplash URL entries kept in memory
+IMAGE_URL_CACHE_SIZE = 512
+# Slide lookups fan out; stay under Unsplash's burst rate limit
+UNSPLASH_MAX_CONCURRENT = 3
+
+
 class ImageService:
     def __init__(self):
         # Load Unsplash API credentials from settings
@@ -14,6 +23,18 @@ class ImageService:
         self.unsplash_secret_key = settings.unsplash_secret_key
         self.unsplash_base_url = "https://api.unsplash.com"
         
+        # Recent Unsplash results, so regenerated or similar decks don't repeat
+        # API calls
+        self._url_cache = OrderedDict()
+        self._url_cache_lock = threading.Lock()
+        self._unsplash_slots = threading.BoundedSemaphore(UNSPLASH_MAX_CONCURRENT)
+
+        # Keep-alive session: slide lookups run concurrently against the same API host
+        self.session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.3)
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                                                   max_retries=retry))
+
         # Topic to color mapping for better placeholders
         self.topic_colors = {
             'machine learning': '2196F3',
@@ -45,7 +66,7 @@ class ImageService:
         try:
             # Try Unsplash first if API key is available
             if self.unsplash_access_key:
-                url = self._get_unsplash_image(topic, slide_title)
+                url = self._cached_unsplash_image(topic, slide_title)
                 if url:
                     logger.info(f"✅ Got Unsplash image for: {topic}")
                     return url
@@ -61,6 +82,23 @@ class ImageService:
             logger.error(f"❌ Failed to get image for topic '{topic}': {e}")
             return self._get_basic_placeholder(size)
     
+    def _cached_unsplash_image(self, topic: str,
+                               slide_title: str = "") -> Optional[str]:
+        """_get_unsplash_image memoized per (topic, slide title); misses not cached"""
+        key = (topic, slide_title)
+        with self._url_cache_lock:
+            url = self._url_cache.get(key)
+            if url is not None:
+                self._url_cache.move_to_end(key)
+                return url
+        url = self._get_unsplash_image(topic, slide_title)
+        if url:
+            with self._url_cache_lock:
+                self._url_cache[key] = url
+                if len(self._url_cache) > IMAGE_URL_CACHE_SIZE:
+                    self._url_cache.popitem(last=False)
+        return url
+
     def _get_unsplash_image(self, topic: str, slide_title: str = "") -> Optional[str]:
         """Get image from Unsplash API"""
         try:
@@ -95,12 +133,13 @@ class ImageService:
             
             logger.info(f"🔍 Searching Unsplash for: '{query}'")
             
-            response = requests.get(
-                f"{self.unsplash_base_url}/search/photos",
-                headers=headers,
-                params=params,
-                timeout=15
-            )
+            with self._unsplash_slots:
+                response = self.session.get(
+                    f"{self.unsplash_base_url}/search/photos",
+                    headers=headers,
+                    params=params,
+                    timeout=15
+                )
             
             if response.status_code == 200:
                 data = response.json()
@@ -191,7 +230,7 @@ class ImageService:
             }
             
             # Test with a simple request
-            response = requests.get(
+            response = self.session.get(
                 f"{self.unsplash_base_url}/photos/random?featured=true",
                 headers=headers,
                 timeout=10
@@ -1,6 +1,7 @@
 import re
 import os
-import sys
+from collections import Counter
+from functools import lru_cache
 from services.slide_schema import Slide, Deck
 from core.logger import get_logger
 
@@ -22,14 +23,90 @@ except ImportError:
     NLTK_AVAILABLE = False
     logger.warning("NLTK not available. Using simplified text analysis.")
 
+# Runs of anything but whitespace and the punctuation we split on
+_TOKEN_RE = re.compile(r'[^\s.,;:!?()\[\]{}"\']+')
+
 # Simple word tokenization function to avoid NLTK dependencies if needed
 def simple_tokenize(text):
     """Simple tokenizer that splits on whitespace and punctuation"""
-    # Replace punctuation with spaces
-    for char in '.,;:!?()[]{}""\'':
-        text = text.replace(char, ' ')
-    # Split on whitespace and filter empty strings
-    return [token for token in text.split() if token]
+    return _TOKEN_RE.findall(text)
+
+# LaTeX-like patterns or equation indicators
+_EQUATION_PATTERNS = [
+    r'\$\$.*?\$\$',          # LaTeX display math
+    r'\$.*?\$',              # LaTeX inline math
+    r'\\frac{',              # Fractions
+    r'\\sum',                # Summation
+    r'\\int',                # Integral
+    r'=[^=]',                # Equal signs (not part of ==)
+    r'matrix|matrices',      # Matrix terms
+    r'\\cdot',               # LaTeX dot product
+    r'\\prod',               # Product operator
+    r'\w+_{[a-zA-Z0-9]+}',   # Subscript notation
+    r'\w+\^',                # Superscript notation
+    r'det\(.*?\)',           # Determinant
+    r'\|.*?\|',              # Absolute value / determinant notation
+    r'\\lambda',             # Lambda (eigenvalues)
+    r'\\mathbf',             # Bold math
+    r'\\mathrm',             # Roman math
+    r'\\nabla',              # Nabla operator
+    r'\\partial',            # Partial derivative
+    r'[a-zA-Z]_\{?[a-zA-Z0-9]+\}?',  # Subscripted variables
+    r'\(\s*[a-zA-Z0-9]+\s*[+\-*/]\s*[a-zA-Z0-9]+\s*\)', # Simple expressions in parentheses
+    r'[a-zA-Z]_{[a-zA-Z]+}',  # Subscript with letters
+]
+
+# Look for code indicators
+_CODE_PATTERNS = [
+    r'```',          # Markdown code blocks
+    r'def\s+\w+\(',   # Python function definitions
+    r'function\s+\w+\(', # JavaScript function
+    r'class\s+\w+[:{]', # Class definitions
+    r'import\s+\w+',  # Import statements
+    r'for\s*\(',      # For loops
+    r'if\s*\(',       # If statements
+    r'while\s*\(',    # While loops
+    r'switch\s*\(',   # Switch statements
+    r'return\s+\w+',  # Return statements
+    r'<[a-z]+>.*?</[a-z]+>', # HTML tags
+    r'[a-z]+\.[a-z]+\(.*?\)', # Method calls
+    r'var\s+\w+\s*=', # Variable declarations
+    r'let\s+\w+\s*=', # JS let declarations
+    r'const\s+\w+\s*=', # JS const declarations
+]
+
+# Each list is folded into one alternation so a slide is scanned once, not once per pattern
+_EQUATION_RE = re.compile('|'.join(f'(?:{p})' for p in _EQUATION_PATTERNS), re.IGNORECASE)
+_CODE_RE = re.compile('|'.join(f'(?:{p})' for p in _CODE_PATTERNS))
+
+# Terms that, two or more together, mark a slide as mathematical
+_MATH_TERMS = ("vector", "scalar", "matrix", "theorem", "equation", "calculus",
+    "derivative", "integral", "function", "operator", "polynomial",
+    "eigenvalue", "eigenvector", "determinant", "linear", "algebra",
+    "multiplication", "addition", "subtraction")
+
+BASIC_STOPWORDS = frozenset({'and', 'the', 'is', 'in', 'it', 'of', 'to', 'for', 'a', 'on', 'with',
+    'this', 'that', 'an', 'are', 'as', 'at', 'be', 'by', 'from', 'has', 
+    'have', 'he', 'she', 'they', 'was', 'were', 'will', 'with', 'about',
+    'after', 'all', 'also', 'am', 'an', 'any', 'because', 'been', 'before',
+    'being', 'between', 'both', 'but', 'can', 'did', 'do', 'does', 'doing',
+    'during', 'each', 'few', 'had', 'has', 'have', 'having', 'here', 'how',
+    'if', 'into', 'just', 'more', 'most', 'no', 'not', 'now', 'only', 'or',
+    'other', 'our', 'out', 'over', 'some', 'such', 'than', 'then', 'there',
+    'these', 'they', 'those', 'through', 'under', 'until', 'very', 'what',
+    'when', 'where', 'which', 'while', 'who', 'why', 'would', 'you', 'your'})
+
+@lru_cache(maxsize=1)
+def _english_stopwords() -> frozenset:
+    """English stopwords, loaded once per process; NLTK's list when available, else BASIC_STOPWORDS"""
+    if NLTK_AVAILABLE:
+        try:
+            stop_words = frozenset(stopwords.words('english'))
+            logger.debug("Using NLTK stopwords")
+            return stop_words
+        except Exception as e:
+            logger.warning(f"Failed to load NLTK stopwords: {e}")
+    return BASIC_STOPWORDS
 
 class LayoutIntelligence:
     """Analyzes content and determines optimal slide layouts for academic presentations"""
@@ -102,38 +179,14 @@ class LayoutIntelligence:
         all_text = all_text.lower()
         tokens = simple_tokenize(all_text)
         
-        # Load stopwords if NLTK is available, otherwise use a simple list
-        if NLTK_AVAILABLE:
-            try:
-                stop_words = set(stopwords.words('english'))
-                logger.debug("Using NLTK stopwords")
-            except Exception as e:
-                logger.warning(f"Failed to load NLTK stopwords: {e}")
-                # Fall back to simple stopwords
-                stop_words = self._get_basic_stopwords()
-        else:
-            # Use simple stopword list
-            stop_words = self._get_basic_stopwords()
-            
-    def _get_basic_stopwords(self):
-        """Return a basic set of English stopwords as fallback when NLTK is not available"""
-        return {'and', 'the', 'is', 'in', 'it', 'of', 'to', 'for', 'a', 'on', 'with', 
-                'this', 'that', 'an', 'are', 'as', 'at', 'be', 'by', 'from', 'has', 
-                'have', 'he', 'she', 'they', 'was', 'were', 'will', 'with', 'about',
-                'after', 'all', 'also', 'am', 'an', 'any', 'because', 'been', 'before',
-                'being', 'between', 'both', 'but', 'can', 'did', 'do', 'does', 'doing',
-                'during', 'each', 'few', 'had', 'has', 'have', 'having', 'here', 'how',
-                'if', 'into', 'just', 'more', 'most', 'no', 'not', 'now', 'only', 'or',
-                'other', 'our', 'out', 'over', 'some', 'such', 'than', 'then', 'there',
-                'these', 'they', 'those', 'through', 'under', 'until', 'very', 'what',
-                'when', 'where', 'which', 'while', 'who', 'why', 'would', 'you', 'your'}
-        
-        filtered_tokens = [w for w in tokens if w not in stop_words]
+        stop_words = _english_stopwords()
+        # Decks repeat words heavily, so match keywords against each distinct token once
+        token_counts = Counter(w for w in tokens if w not in stop_words)
         
         # Count subject keyword matches
         subject_scores = {}
         for subject, keywords in self.subject_keywords.items():
-            score = sum(1 for token in filtered_tokens for keyword in keywords if keyword in token)
+            score = sum(count for token, count in token_counts.items() for keyword in keywords if keyword in token)
             subject_scores[subject] = score
         
         # Return highest scoring subject, default to 'general' if none found
@@ -141,6 +194,10 @@ class LayoutIntelligence:
             return 'general'
         return max(subject_scores, key=subject_scores.get)
     
+    def _get_basic_stopwords(self):
+        """Return a basic set of English stopwords as fallback when NLTK is not available"""
+        return BASIC_STOPWORDS
+    
     def _select_layout_for_slide(self, slide: Slide, subject_area: str, position: int, total_slides: int) -> str:
         """Select the optimal layout for a slide based on content and context"""
         # Content characteristics
@@ -216,47 +273,17 @@ class LayoutIntelligence:
     def _contains_equations(self, slide: Slide) -> bool:
         """Check if slide likely contains mathematical equations"""
         try:
-            # Look for LaTeX-like patterns or equation indicators
-            equation_patterns = [
-                r'\$\$.*?\$\$',          # LaTeX display math
-                r'\$.*?\$',              # LaTeX inline math
-                r'\\frac{',              # Fractions
-                r'\\sum',                # Summation
-                r'\\int',                # Integral
-                r'=[^=]',                # Equal signs (not part of ==)
-                r'matrix|matrices',      # Matrix terms
-                r'\\cdot',               # LaTeX dot product
-                r'\\prod',               # Product operator
-                r'\w+_{[a-zA-Z0-9]+}',   # Subscript notation
-                r'\w+\^',                # Superscript notation
-                r'det\(.*?\)',           # Determinant
-                r'\|.*?\|',              # Absolute value / determinant notation
-                r'\\lambda',             # Lambda (eigenvalues)
-                r'\\mathbf',             # Bold math
-                r'\\mathrm',             # Roman math
-                r'\\nabla',              # Nabla operator
-                r'\\partial',            # Partial derivative
-                r'[a-zA-Z]_\{?[a-zA-Z0-9]+\}?',  # Subscripted variables
-                r'\(\s*[a-zA-Z0-9]+\s*[+\-*/]\s*[a-zA-Z0-9]+\s*\)', # Simple expressions in parentheses
-                r'[a-zA-Z]_{[a-zA-Z]+}',  # Subscript with letters
-            ]
-            
             text_to_check = self._get_slide_text(slide)
             
             # Check against regular expression patterns
-            for pattern in equation_patterns:
-                if re.search(pattern, text_to_check, re.IGNORECASE):
-                    logger.debug(f"Found equation pattern: {pattern}")
-                    return True
-            
-            # Check for mathematical term clusters
-            math_terms = ["vector", "scalar", "matrix", "theorem", "equation", "calculus", 
-                        "derivative", "integral", "function", "operator", "polynomial", 
-                        "eigenvalue", "eigenvector", "determinant", "linear", "algebra",
-                        "multiplication", "addition", "subtraction"]
+            match = _EQUATION_RE.search(text_to_check)
+            if match:
+                logger.debug(f"Found equation pattern: {match.group(0)}")
+                return True
             
             # Count how many math terms appear in the text
-            math_term_count = sum(1 for term in math_terms if term.lower() in text_to_check.lower())
+            lowered = text_to_check.lower()
+            math_term_count = sum(1 for term in _MATH_TERMS if term in lowered)
             
             # If at least 2 different math terms are present, consider it mathematical
             if math_term_count >= 2:
@@ -271,31 +298,12 @@ class LayoutIntelligence:
     def _contains_code(self, slide: Slide) -> bool:
         """Check if slide likely contains code snippets"""
         try:
-            # Look for code indicators
-            code_patterns = [
-                r'```',          # Markdown code blocks
-                r'def\s+\w+\(',   # Python function definitions
-                r'function\s+\w+\(', # JavaScript function
-                r'class\s+\w+[:{]', # Class definitions
-                r'import\s+\w+',  # Import statements
-                r'for\s*\(',      # For loops
-                r'if\s*\(',       # If statements
-                r'while\s*\(',    # While loops
-                r'switch\s*\(',   # Switch statements
-                r'return\s+\w+',  # Return statements
-                r'<[a-z]+>.*?</[a-z]+>', # HTML tags
-                r'[a-z]+\.[a-z]+\(.*?\)', # Method calls
-                r'var\s+\w+\s*=', # Variable declarations
-                r'let\s+\w+\s*=', # JS let declarations
-                r'const\s+\w+\s*=', # JS const declarations
-            ]
-            
             text_to_check = self._get_slide_text(slide)
             
-            for pattern in code_patterns:
-                if re.search(pattern, text_to_check):
-                    logger.debug(f"Found code pattern: {pattern}")
-                    return True
+            match = _CODE_RE.search(text_to_check)
+            if match:
+                logger.debug(f"Found code pattern: {match.group(0)}")
+                return True
                     
         except Exception as e:
             logger.error(f"Error in code detection: {e}")
@@ -1,31 +1,517 @@
+import asyncio
+import hashlib
 import os
-import uuid
+import re
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from dataclasses import dataclass
 import requests
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pptx import Presentation
 from pptx.util import Pt, Inches
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR, MSO_AUTO_SIZE
 from pptx.enum.shapes import MSO_SHAPE
 from pptx.dml.color import RGBColor
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
 from services.slide_schema import Deck, Slide, BulletPoint
 from services.layout_intelligence import LayoutIntelligence
 from services.theme_manager import ThemeManager
+from core.config import settings
 from core.logger import get_logger
 from io import BytesIO
-from PIL import Image
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile
+from PIL import Image, ImageFont
 
 TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), '..', 'templates', 'template.pptx')
 logger = get_logger("ppt_builder")
+SHADOW_HEX = "000000"
+LIGHT_TEXT_COLOR = RGBColor(127, 140, 141)
+WHITE = RGBColor(255, 255, 255)
+LIGHT_BLUE_FILL = RGBColor(230, 242, 255)
+LIGHT_ORANGE_FILL = RGBColor(255, 242, 230)
+WARM_FILL = RGBColor(250, 240, 230)
+IMAGE_PREFETCH_WORKERS = 8
+IMAGE_MAX_PER_HOST = 6
+# Decks larger than this spill from RAM to a temp file
+PPTX_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+IMAGE_TARGET_DPI = 192  # 2x screen density, sharp on high-DPI displays and projectors
+IMAGE_SLOT_MAX_INCHES = 4.8  # Longest side of any image slot on a slide
+IMAGE_MAX_PIXELS = int(IMAGE_SLOT_MAX_INCHES * IMAGE_TARGET_DPI)
+SLIDE_PROGRESS_MIN_INTERVAL = 0.25  # Seconds between slide_progress events
+IMAGE_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+IMAGE_MAX_DOWNLOAD_BYTES = 25 * 1024 * 1024  # Larger bodies are not worth embedding
+
+# Shared HTTP session so repeated image hosts reuse keep-alive connections
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                       max_retries=Retry(total=2, backoff_factor=0.3))
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+# On-disk cache of downloaded image bodies, shared across builds
+IMAGE_CACHE_DIR = settings.image_cache_dir or os.path.join(
+    os.path.expanduser("~"), ".cache", "ppt_builder", "images"
+)
+
+# Per-host download slots so a deck full of images from one CDN stays polite
+_HOST_SLOTS = {}
+_HOST_SLOTS_LOCK = threading.Lock()
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    """Semaphore bounding concurrent downloads from the URL's host"""
+    host = urlsplit(url).netloc
+    with _HOST_SLOTS_LOCK:
+        slot = _HOST_SLOTS.get(host)
+        if slot is None:
+            slot = _HOST_SLOTS[host] = threading.BoundedSemaphore(IMAGE_MAX_PER_HOST)
+    return slot
+
+
+def _fetch_image_bytes(url: str, timeout: int = 10) -> bytes:
+    """Return an image body from the disk cache, downloading and caching it on a miss"""
+    cache_path = None
+    if settings.image_cache_enabled:
+        url_hash = hashlib.sha1(url.encode()).hexdigest()
+        cache_path = os.path.join(IMAGE_CACHE_DIR, url_hash)
+        try:
+            with open(cache_path, 'rb') as f:
+                content = f.read()
+            os.utime(cache_path)  # Mark as recently used for eviction
+            return content
+        except OSError:
+            pass
+
+    with _host_slot(url), _SESSION.get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        # Accumulate chunks in one growing buffer instead of joining a list of them
+        content = bytearray()
+        for chunk in response.iter_content(IMAGE_DOWNLOAD_CHUNK_SIZE):
+            content += chunk
+            if len(content) > IMAGE_MAX_DOWNLOAD_BYTES:
+                raise ValueError(
+                    f"Image exceeds {IMAGE_MAX_DOWNLOAD_BYTES} bytes: {url}"
+                )
+    if cache_path:
+        _store_cached_image(cache_path, content)
+    return content
+
+
+def _store_cached_image(cache_path: str, content: bytes):
+    """Atomically write an image body to the cache, then evict entries if over budget"""
+    try:
+        os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+        with NamedTemporaryFile(
+            dir=IMAGE_CACHE_DIR, delete=False, suffix='.tmp'
+        ) as tmp:
+            tmp.write(content)
+        os.replace(tmp.name, cache_path)
+        _evict_image_cache(settings.image_cache_max_mb * 1024 * 1024)
+    except OSError as e:
+        logger.warning(f"Could not write image cache entry: {e}")
+
+
+def _evict_image_cache(max_bytes: int):
+    """Delete least recently used cache entries until the cache fits in max_bytes"""
+    entries = []
+    total = 0
+    with os.scandir(IMAGE_CACHE_DIR) as it:
+        for entry in it:
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    if total <= max_bytes:
+        return
+    for _, size, path in sorted(entries):
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+        if total <= max_bytes:
+            break
+
+
+# Point sizes used by the layout helpers, allocated once instead of per paragraph
+_PT_CACHE = {
+    size: Pt(size)
+    for size in (1, 1.5, 2, 2.5, 3, 4, 6, 8, 9, 10, 11, 12, 14, 15, 16, 18, 20, 24,
+                 28, 32, 36, 40, 44)
+}
+_AUTO_FIT = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+
+
+def _pt(size) -> Pt:
+    """Return a cached Pt length, creating it only for uncommon sizes"""
+    length = _PT_CACHE.get(size)
+    return length if length is not None else Pt(size)
+
+
+@lru_cache(maxsize=128)
+def _inches(value) -> Inches:
+    """Return a cached Inches length; layout code reuses a small set of dimensions"""
+    return Inches(value)
+
+
+# Serialized bullet paragraph, mirroring what _format_bullet_point produces
+# through the API
+_BULLET_PARAGRAPH_XML = (
+    '<a:p><a:pPr{lvl} algn="l"><a:lnSpc><a:spcPct val="120000"/></a:lnSpc>'
+    '<a:spcBef><a:spcPts val="300"/></a:spcBef>'
+    '<a:spcAft><a:spcPts val="{space_after}"/></a:spcAft>'
+    '<a:defRPr sz="{size}"{emphasis}>'
+    '<a:solidFill><a:srgbClr val="{color}"/></a:solidFill></a:defRPr>'
+    '</a:pPr>{run}</a:p>'
+)
+# Compact paragraph of the overflow-safe textbox: level, size and optional
+# bold/italic only
+_COMPACT_PARAGRAPH_XML = '<a:p><a:pPr{lvl}><a:defRPr{attrs}/></a:pPr>{run}</a:p>'
+# Process diagram autoshapes, serialized exactly as add_shape plus the
+# step/arrow styling would produce them
+_SHAPE_STYLE_XML = (
+    '<p:style><a:lnRef idx="1"><a:schemeClr val="accent1"/></a:lnRef>'
+    '<a:fillRef idx="3"><a:schemeClr val="accent1"/></a:fillRef>'
+    '<a:effectRef idx="2"><a:schemeClr val="accent1"/></a:effectRef>'
+    '<a:fontRef idx="minor"><a:schemeClr val="lt1"/></a:fontRef></p:style>'
+)
+_PROCESS_STEP_XML = (
+    '<p:sp><p:nvSpPr><p:cNvPr id="{id}" name="Rectangle {name_idx}"/>'
+    '<p:cNvSpPr/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom>'
+    '<a:solidFill><a:srgbClr val="{fill}"/></a:solidFill>'
+    '<a:ln w="25400"><a:solidFill><a:srgbClr val="{line}"/></a:solidFill></a:ln>'
+    '<a:effectLst><a:outerShdw blurRad="38100" dist="25400" dir="2700000" algn="tl"'
+    ' rotWithShape="0"><a:srgbClr val="{shadow}"><a:alpha val="70000"/></a:srgbClr>'
+    '</a:outerShdw></a:effectLst></p:spPr>'
+) + _SHAPE_STYLE_XML + (
+    '<p:txBody><a:bodyPr rtlCol="0" anchor="ctr" lIns="101600" rIns="101600"'
+    ' tIns="76200" bIns="76200" wrap="square"/>'
+    '<a:lstStyle/><a:p><a:pPr algn="ctr"><a:lnSpc><a:spcPct val="110000"/></a:lnSpc>'
+    '<a:defRPr sz="{size}" b="1">'
+    '<a:solidFill><a:srgbClr val="FFFFFF"/></a:solidFill></a:defRPr>'
+    '</a:pPr></a:p></p:txBody></p:sp>'
+)
+_PROCESS_ARROW_XML = (
+    '<p:sp><p:nvSpPr><p:cNvPr id="{id}" name="Right Arrow {name_idx}"/>'
+    '<p:cNvSpPr/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rightArrow"><a:avLst/></a:prstGeom>'
+    '<a:solidFill><a:srgbClr val="{fill}"/></a:solidFill>'
+    '<a:ln w="12700"><a:solidFill><a:srgbClr val="{line}"/></a:solidFill></a:ln>'
+    '</p:spPr>'
+) + _SHAPE_STYLE_XML + (
+    '<p:txBody><a:bodyPr rtlCol="0" anchor="ctr"/><a:lstStyle/>'
+    '<a:p><a:pPr algn="ctr"/></a:p></p:txBody></p:sp>'
+)
+# Text body shared by every compact process step box; the step text is appended per box
+_COMPACT_STEP_TXBODY_XML = (
+    f'<p:txBody {nsdecls("p", "a")}>'
+    '<a:bodyPr rtlCol="0" anchor="ctr" lIns="50800" rIns="50800" tIns="38100"'
+    ' bIns="38100" wrap="square"/>'
+    '<a:lstStyle/><a:p><a:pPr algn="ctr">'
+    '<a:defRPr sz="900" b="1">'
+    '<a:solidFill><a:srgbClr val="FFFFFF"/></a:solidFill></a:defRPr>'
+    '</a:pPr></a:p></p:txBody>'
+)
+
+# Straight connector line as add_connector creates it, with the hierarchy line
+# styling applied
+_CONNECTOR_XML = (
+    '<p:cxnSp><p:nvCxnSpPr><p:cNvPr id="{id}" name="Connector {name_idx}"/>'
+    '<p:cNvCxnSpPr/><p:nvPr/></p:nvCxnSpPr>'
+    '<p:spPr><a:xfrm{flip}><a:off x="{x}" y="{y}"/>'
+    '<a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="line"><a:avLst/></a:prstGeom>'
+    '<a:ln w="{width}"><a:solidFill><a:srgbClr val="{color}"/></a:solidFill></a:ln>'
+    '</p:spPr>'
+    '<p:style><a:lnRef idx="2"><a:schemeClr val="accent1"/></a:lnRef>'
+    '<a:fillRef idx="0"><a:schemeClr val="accent1"/></a:fillRef>'
+    '<a:effectRef idx="1"><a:schemeClr val="accent1"/></a:effectRef>'
+    '<a:fontRef idx="minor"><a:schemeClr val="tx1"/></a:fontRef></p:style></p:cxnSp>'
+)
+
+
+def _connector_xml(shape_id: int, begin_x, begin_y, end_x, end_y, width,
+                   color_hex: str) -> str:
+    """Serialize a straight connector between two points, flipped like add_connector"""
+    begin_x, begin_y, end_x, end_y = int(begin_x), int(begin_y), int(end_x), int(end_y)
+    flip_h = ' flipH="1"' if end_x < begin_x else ''
+    flip_v = ' flipV="1"' if end_y < begin_y else ''
+    flip = flip_h + flip_v
+    return _CONNECTOR_XML.format(
+        id=shape_id, name_idx=shape_id - 1, flip=flip,
+        x=min(begin_x, end_x), y=min(begin_y, end_y),
+        cx=abs(end_x - begin_x), cy=abs(end_y - begin_y),
+        width=int(width), color=color_hex,
+    )
+
+
+# Line breaks and other control characters need python-pptx's own text handling
+_CONTROL_CHARS = re.compile(r'[\x00-\x1f]')
+
+
+def _text_run_xml(text: str) -> str:
+    """Serialized <a:r> for plain text, or nothing for an empty paragraph"""
+    return f'<a:r><a:t>{escape(text)}</a:t></a:r>' if text else ''
+
+
+def _replace_paragraphs(text_frame, paragraphs_xml: str):
+    """Swap all paragraphs of a text frame for serialized <a:p> elements in one parse"""
+    fragment = parse_xml(f'<a:txBody {nsdecls("a")}>{paragraphs_xml}</a:txBody>')
+    txBody = text_frame._txBody
+    for p in txBody.p_lst:
+        txBody.remove(p)
+    txBody.extend(list(fragment))
+
+
+# Text-length upper bounds separating the bullet font-size buckets
+BULLET_LENGTH_BOUNDS = (50, 100, 150, 200)
+
+
+def _truncate(text: str, max_length: int) -> str:
+    """Cut text to max_length characters, ending with an ellipsis when shortened"""
+    return text if len(text) <= max_length else text[:max_length - 3] + "..."
+
+
+# Font size range searched when fitting dense text into a fixed box; the maximum
+# is the fixed 16pt (14pt sub-points) dense slides always used, so only
+# overflowing text shrinks
+FIT_FONT_MIN = 10
+FIT_FONT_MAX = 16
+# Up to this many items and characters fit the 9x5in box at FIT_FONT_MAX
+# without measuring
+OVERFLOW_FAST_PATH_ITEMS = 4
+OVERFLOW_FAST_PATH_CHARS = 400
+_MEASURE_FONT_FILES = (
+    "DejaVuSans.ttf", "Arial.ttf", "arial.ttf", "LiberationSans-Regular.ttf"
+)
+_MEASURE_FONTS = {}
+
+
+def _measure_font(size: float):
+    """TrueType font for measuring text at a point size, or None without a font file"""
+    if size not in _MEASURE_FONTS:
+        font = None
+        for font_file in _MEASURE_FONT_FILES:
+            try:
+                font = ImageFont.truetype(font_file, size)
+                break
+            except OSError:
+                continue
+        _MEASURE_FONTS[size] = font
+    return _MEASURE_FONTS[size]
+
+
+def _wrapped_line_count(text: str, size: float, width_pt: float) -> int:
+    """Number of lines text wraps to at a font size within width_pt"""
+    font = _measure_font(size)
+    measure = font.getlength if font else (lambda s: len(s) * size * 0.5)
+    space = measure(" ")
+    lines, line_width = 1, 0.0
+    for word in text.split():
+        word_width = measure(word)
+        if line_width and line_width + space + word_width > width_pt:
+            lines += 1
+            line_width = word_width
+        else:
+            line_width += (space if line_width else 0) + word_width
+        # Words longer than the line break across several lines
+        while line_width > width_pt:
+            lines += 1
+            line_width -= width_pt
+    return lines
+
+
+def _fit_font_size(items, width_pt: float, height_pt: float, eps: float = 0.5):
+    """Largest base font size at which (text, level) items fit the box, or None
+
+    Binary search between FIT_FONT_MIN and FIT_FONT_MAX; level 1 items use base - 2
+    and every paragraph takes 1.2 line spacing plus its space before/after.
+    """
+    def fits(base):
+        total = 0.0
+        for text, level in items:
+            size = base - 2 if level else base
+            lines = _wrapped_line_count(text, size, width_pt)
+            total += lines * size * 1.2 + (6 if level else 9)
+            if total > height_pt:
+                return False
+        return True
+
+    low, high = FIT_FONT_MIN, FIT_FONT_MAX
+    if not fits(low):
+        return None
+    if fits(high):
+        return high
+    while high - low > eps:
+        mid = (low + high) / 2
+        if fits(mid):
+            low = mid
+        else:
+            high = mid
+    return round(low * 2) / 2
+
+
+def _point_text(point) -> str:
+    """Text of a bullet given as a BulletPoint, a raw dict or a plain string"""
+    if isinstance(point, BulletPoint):
+        return point.text
+    if isinstance(point, dict):
+        return str(point.get('text', str(point)))
+    return str(point)
+
+
+def _bullet_fields(point) -> tuple:
+    """(text, sub_points, level) of a bullet given in any supported form"""
+    if isinstance(point, BulletPoint):
+        return point.text, point.sub_points or [], point.level
+    if isinstance(point, dict):
+        return (point.get('text', str(point)), point.get('sub_points', []),
+                point.get('level', 0))
+    return str(point), [], 0
+
+
+def _pick_extractor(points):
+    """Pick a (text, sub_points, level) extractor once for a homogeneous bullet list"""
+    if points:
+        first_type = type(points[0])
+        if all(type(point) is first_type for point in points):
+            if first_type is BulletPoint:
+                return lambda point: (point.text, point.sub_points or [], point.level)
+            if first_type is str:
+                return lambda point: (point, [], 0)
+    # Mixed or dict bullets fall back to per-item dispatch
+    return _bullet_fields
+
+
+def _item_labels(items, key: str, default: str = None) -> list:
+    """Display text of each diagram entry: item[key] for dicts, str(item) otherwise
+
+    default may contain "{}", which is filled with the 1-based position of the entry.
+    """
+    return [
+        (item.get(key, str(item) if default is None else default.format(i + 1))
+         if isinstance(item, dict) else str(item))
+        for i, item in enumerate(items)
+    ]
+
+
+# Minimum number of data entries each diagram renderer needs to draw anything
+DIAGRAM_MIN_ITEMS = {
+    'process': 1,
+    'comparison': 2,
+    'hierarchy': 1,
+}
+
+
+@dataclass
+class SlideMetrics:
+    """Text size metrics for a slide, computed once and shared by layout decisions"""
+    content_chars: int
+    item_count: int
+    density: float
+    is_dense: bool
+    needs_split: bool
+
 
 # --- Diagram service stub ---
-def generate_diagram_image(description: str) -> BytesIO:
+@lru_cache(maxsize=256)
+def _render_diagram_bytes(description: str) -> bytes:
     # TODO: Implement with Mermaid, Graphviz, or external API
     # For now, return a blank image
-    from PIL import Image
     img = Image.new('RGB', (400, 200), color = (255, 255, 255))
     buf = BytesIO()
     img.save(buf, format='PNG')
-    buf.seek(0)
-    return buf
+    return buf.getvalue()
+
+
+def generate_diagram_image(description: str) -> BytesIO:
+    # Rendered bytes are cached per description; each caller gets its own stream
+    return BytesIO(_render_diagram_bytes(description))
+
+
+def _compute_hierarchy_geometry(count: int, box_width: int, gap: int,
+                                slide_width: int = _inches(10)) -> list:
+    """Left offsets (EMU) of `count` boxes centred horizontally on the slide"""
+    total_width = count * box_width + (count - 1) * gap
+    start_left = (slide_width - total_width) / 2
+    step = box_width + gap
+    return [start_left + i * step for i in range(count)]
+
+
+def _prepare_image(raw_bytes: bytes, max_pixels: int = IMAGE_MAX_PIXELS) -> bytes:
+    """Downscale an image to slide resolution and re-encode it once before embedding"""
+    try:
+        with Image.open(BytesIO(raw_bytes)) as img:
+            if max(img.size) <= max_pixels:
+                return raw_bytes
+            img.thumbnail((max_pixels, max_pixels), Image.LANCZOS)
+            buf = BytesIO()
+            has_alpha = img.mode in ('RGBA', 'LA') or (
+                img.mode == 'P' and 'transparency' in img.info
+            )
+            if has_alpha:
+                img.save(buf, format='PNG', optimize=True)
+            else:
+                img.convert('RGB').save(buf, format='JPEG', quality=85, optimize=True)
+            return buf.getvalue()
+    except Exception as e:
+        logger.warning(f"Could not downscale image, embedding original: {e}")
+        return raw_bytes
+
+
+@lru_cache(maxsize=16)
+def _bullet_style_table(level_colors: tuple) -> dict:
+    """Precompute (font size, color) for every bullet level and text-length bucket"""
+    # Enhanced base font sizes for different levels
+    base_font_sizes = (18, 16, 14, 12)
+    styles = {}
+    for level_idx, base_size in enumerate(base_font_sizes):
+        # Buckets follow BULLET_LENGTH_BOUNDS: short, short-medium, medium, long,
+        # very long
+        sizes = (
+            base_size,
+            max(base_size - 1, 16),
+            max(base_size - 2, 14),
+            max(base_size - 4, 12),
+            max(base_size - 6, 10),
+        )
+        for bucket, font_size in enumerate(sizes):
+            styles[(level_idx, bucket)] = (_pt(font_size), level_colors[level_idx])
+    return styles
+
+
+_LAYOUT_ENGINE = None
+
+
+def _get_layout_engine() -> LayoutIntelligence:
+    """Return the shared LayoutIntelligence instance, creating it on first use"""
+    global _LAYOUT_ENGINE
+    if _LAYOUT_ENGINE is None:
+        _LAYOUT_ENGINE = LayoutIntelligence()
+    return _LAYOUT_ENGINE
+
+
+@lru_cache(maxsize=8)
+def _load_clean_template(template_path: str, mtime: float) -> bytes:
+    """Load a template with its seed slides removed, cached per path and mtime"""
+    prs = Presentation(template_path)
+    xml_slides = prs.slides._sldIdLst
+    for sld_id in list(xml_slides):
+        xml_slides.remove(sld_id)
+        prs.part.drop_rel(sld_id.rId)
+    buf = BytesIO()
+    prs.save(buf)
+    return buf.getvalue()
 
 # --- Plugin-style layout system ---
 class BaseLayout:
@@ -36,24 +522,20 @@ class TitleBulletsLayout(BaseLayout):
     def render(self, slide_data: Slide, pptx_slide):
         title_shape = pptx_slide.shapes.title
         title_shape.text = slide_data.title
-        title_shape.text_frame.paragraphs[0].font.size = Pt(32)
+        title_shape.text_frame.paragraphs[0].font.size = _pt(32)
         title_shape.text_frame.paragraphs[0].alignment = PP_ALIGN.LEFT
         if slide_data.bullets:
-            content_shape = None
-            for shape in pptx_slide.shapes:
-                if shape.has_text_frame and shape != title_shape:
-                    content_shape = shape
-                    break
+            content_shape = find_content_shape(pptx_slide, title_shape)
             if content_shape:
                 tf = content_shape.text_frame
                 tf.clear()
                 for bullet in slide_data.bullets:
                     p = tf.add_paragraph()
                     p.text = bullet
-                    p.font.size = Pt(20)
+                    p.font.size = _pt(20)
                     p.level = 0
                     p.alignment = PP_ALIGN.LEFT
-        if slide_data.notes:
+        if slide_data.notes and slide_data.notes.strip():
             pptx_slide.notes_slide.notes_text_frame.text = slide_data.notes
         # Images handled by PPTBuilder
 
@@ -61,42 +543,47 @@ class ImageLayout(BaseLayout):
     def render(self, slide_data: Slide, pptx_slide):
         title_shape = pptx_slide.shapes.title
         title_shape.text = slide_data.title
-        title_shape.text_frame.paragraphs[0].font.size = Pt(32)
+        title_shape.text_frame.paragraphs[0].font.size = _pt(32)
         title_shape.text_frame.paragraphs[0].alignment = PP_ALIGN.LEFT
         # Insert first image (if any)
         if slide_data.images:
             img_url = slide_data.images[0]
             try:
-                img_bytes = requests.get(img_url, timeout=5).content
-                image_stream = BytesIO(img_bytes)
+                raw_bytes = _fetch_image_bytes(img_url, timeout=5)
+                image_stream = BytesIO(_prepare_image(raw_bytes))
                 # Place image in center of slide
-                pptx_slide.shapes.add_picture(image_stream, Inches(2), Inches(2), width=Inches(4))
+                pptx_slide.shapes.add_picture(
+                    image_stream, _inches(2), _inches(2), width=_inches(4)
+                )
             except Exception as e:
                 logger.error(f"Failed to embed image: {img_url} - {e}")
-        if slide_data.notes:
+        if slide_data.notes and slide_data.notes.strip():
             pptx_slide.notes_slide.notes_text_frame.text = slide_data.notes
 
 class DiagramLayout(BaseLayout):
     def render(self, slide_data: Slide, pptx_slide):
         title_shape = pptx_slide.shapes.title
         title_shape.text = slide_data.title
-        title_shape.text_frame.paragraphs[0].font.size = Pt(32)
+        title_shape.text_frame.paragraphs[0].font.size = _pt(32)
         title_shape.text_frame.paragraphs[0].alignment = PP_ALIGN.LEFT
         # Insert first diagram (if any)
         if slide_data.diagrams:
             desc = slide_data.diagrams[0]
             try:
                 diagram_img = generate_diagram_image(desc)
-                pptx_slide.shapes.add_picture(diagram_img, Inches(2), Inches(2), width=Inches(4))
+                pptx_slide.shapes.add_picture(
+                    diagram_img, _inches(2), _inches(2), width=_inches(4)
+                )
             except Exception as e:
                 logger.error(f"Failed to embed diagram: {desc} - {e}")
-        if slide_data.notes:
+        if slide_data.notes and slide_data.notes.strip():
             pptx_slide.notes_slide.notes_text_frame.text = slide_data.notes
 
 # Import academic layouts
 from services.academic_layouts import (
     EquationLayout, CodeLayout, TaxonomyLayout,
-    TextDenseLayout, TextSparseLayout, ConclusionLayout
+    TextDenseLayout, TextSparseLayout, ConclusionLayout,
+    find_content_shape
 )
 
 # Layout registry
@@ -131,21 +618,38 @@ class PPTBuilder:
         # Get theme colors from ThemeManager
         theme_data = ThemeManager.get_theme_colors(theme)
         self.colors = {
-            'primary': theme_data['primary'],
-            'secondary': theme_data['secondary'],
-            'accent': theme_data['accent'],
-            'background': theme_data['background'],
-            'text': theme_data['text'],
-            'light_text': RGBColor(127, 140, 141)  # Light gray (keeping for backward compatibility)
+            'primary': theme_data.primary,
+            'secondary': theme_data.secondary,
+            'accent': theme_data.accent,
+            'background': theme_data.background,
+            'text': theme_data.text,
+            # Light gray (keeping for backward compatibility)
+            'light_text': LIGHT_TEXT_COLOR
         }
         self.fonts = {
-            'title': theme_data['title_font'],
-            'body': theme_data['body_font']
+            'title': theme_data.title_font,
+            'body': theme_data.body_font
         }
+        # Palette pre-serialized to the hex form used by <a:srgbClr val="...">
+        self._hex = {name: str(color) for name, color in self.colors.items()}
+        # Per-level bullet colors, resolved once instead of on every paragraph
+        self._bullet_level_colors = (
+            self.colors['text'], self.colors['light_text'],
+            self.colors['light_text'], self.colors['light_text']
+        )
+        # (level, length bucket) -> (font size, color) for bullet paragraphs
+        self._bullet_styles = _bullet_style_table(self._bullet_level_colors)
+        # Pending image downloads keyed by URL (a None result marks a failed download)
+        self._image_futures = {}
+        # id(slide) -> (slide, metrics) for the current build; holding the slide
+        # keeps its id from being reused
+        self._slide_metrics = {}
 
-    def build(self, deck: Deck, use_template: bool = True, job_id: str = None) -> BytesIO:
+    def build(self, deck: Deck, use_template: bool = True,
+              job_id: str = None) -> SpooledTemporaryFile:
         try:
             logger.info(f"Building PPTX. use_template={use_template}, slides={len(deck.slides)}")
+            self._slide_metrics = {}
             
             # Emit streaming event if job_id provided
             if job_id:
@@ -156,14 +660,17 @@ class PPTBuilder:
                 })
             
             # Apply intelligent layout selection
-            layout_engine = LayoutIntelligence()
-            deck = layout_engine.determine_optimal_layouts(deck)
+            deck = _get_layout_engine().determine_optimal_layouts(deck)
             logger.info(f"Applied intelligent layout selection to deck")
             
             # Pre-process slides to handle content overflow
             processed_deck = self._preprocess_slides_for_overflow(deck)
             logger.info(f"Pre-processed slides to handle overflow. Original slides: {len(deck.slides)}, Processed slides: {len(processed_deck.slides)}")
             
+            # Start downloading all slide images concurrently; rendering overlaps
+            # with the downloads
+            self._prefetch_images(processed_deck)
+
             if job_id:
                 streaming_service.emit_event(job_id, "slides_processing", {
                     "message": f"Processing {len(processed_deck.slides)} slides...",
@@ -174,26 +681,36 @@ class PPTBuilder:
             if use_template:
                 if not os.path.exists(self.template_path):
                     raise FileNotFoundError(f"PPTX template not found: {self.template_path}")
-                prs = Presentation(self.template_path)
+                # Seed slides are stripped once per template file, not on every build
+                template_bytes = _load_clean_template(
+                    self.template_path, os.path.getmtime(self.template_path)
+                )
+                prs = Presentation(BytesIO(template_bytes))
             else:
                 prs = Presentation()
             
-            # Clear existing slides if using template
-            slide_count = len(prs.slides)
-            for i in range(slide_count - 1, -1, -1):
-                self._delete_slide(prs, i)
-            
+            total_slides = len(processed_deck.slides)
+            # Progress events are coalesced: first and last slide, every ~5%, or
+            # after a quiet interval
+            progress_step = max(1, total_slides // 20)
+            last_emit_ts = 0.0
+
             for i, slide_data in enumerate(processed_deck.slides):
                 logger.info(f"Processing slide {i+1}: {slide_data.title} (type: {slide_data.type})")
                 
-                # Emit progress for each slide
-                if job_id:
+                # Emit progress for the slide when due
+                now = time.monotonic()
+                at_edge = i == 0 or i == total_slides - 1
+                on_step = (i + 1) % progress_step == 0
+                quiet = now - last_emit_ts > SLIDE_PROGRESS_MIN_INTERVAL
+                if job_id and (at_edge or on_step or quiet):
+                    last_emit_ts = now
                     streaming_service.emit_event(job_id, "slide_progress", {
                         "message": f"Creating slide {i+1}: {slide_data.title}",
                         "slide_number": i + 1,
                         "slide_title": slide_data.title,
                         "slide_type": slide_data.type,
-                        "progress": round((i + 1) / len(processed_deck.slides) * 100, 1),
+                        "progress": round((i + 1) / total_slides * 100, 1),
                         "step": "slide_creation"
                     })
                 
@@ -205,58 +722,45 @@ class PPTBuilder:
                     "step": "finalization"
                 })
             
-            # Save to BytesIO instead of local file
-            pptx_stream = BytesIO()
+            # Save to a spooled buffer: in memory for typical decks, on disk for
+            # very large ones
+            pptx_stream = SpooledTemporaryFile(
+                max_size=PPTX_SPOOL_MAX_SIZE, suffix='.pptx'
+            )
             prs.save(pptx_stream)
             pptx_stream.seek(0)
-            logger.info(f"PPTX generated in memory")
+            logger.info("PPTX generated in spooled buffer")
             return pptx_stream
         except Exception as e:
             logger.error(f"Failed to build PPTX: {e}")
             raise
+        finally:
+            # Release the slides pinned by the metrics cache
+            self._slide_metrics = {}
             
+    async def abuild(self, deck: Deck, use_template: bool = True,
+                     job_id: str = None) -> SpooledTemporaryFile:
+        """Async variant of build for event-loop callers, run in a worker thread"""
+        return await asyncio.to_thread(self.build, deck, use_template, job_id)
+
     def _preprocess_slides_for_overflow(self, deck: Deck) -> Deck:
         """Pre-process slides to handle content overflow by splitting extremely content-heavy slides"""
-        from copy import deepcopy
-        
-        processed_deck = deepcopy(deck)
         new_slides = []
         
-        # Analyze each slide for potential overflow
-        for i, slide in enumerate(processed_deck.slides):
+        # Analyze each slide for potential overflow; slides are only copied when split
+        for i, slide in enumerate(deck.slides):
             # Skip title slide
             if i == 0 or slide.type == "title":
                 new_slides.append(slide)
                 continue
                 
             # Check if slide has excessive content
-            needs_splitting = False
-            content_length = 0
-            bullet_count = 0
-            
-            if slide.content:
-                bullet_count = len(slide.content) if isinstance(slide.content, list) else 0
-                for point in slide.content:
-                    if hasattr(point, 'text'):
-                        if hasattr(point.text, '__len__'):
-                            content_length += len(point.text)
-                        else:
-                            content_length += len(str(point.text))
-                        if hasattr(point, 'sub_points') and point.sub_points and isinstance(point.sub_points, list):
-                            bullet_count += len(point.sub_points)
-                            for sub in point.sub_points:
-                                content_length += len(str(sub))
-                    else:
-                        content_length += len(str(point))
-            elif slide.bullets:
-                bullet_count = len(slide.bullets) if isinstance(slide.bullets, list) else 0
-                if isinstance(slide.bullets, list):
-                    content_length = sum(len(str(bullet)) for bullet in slide.bullets)
-                else:
-                    content_length = 0
+            metrics = self._get_slide_metrics(slide)
+            content_length = metrics.content_chars
+            bullet_count = metrics.item_count
             
             # Determine if slide needs splitting
-            needs_splitting = (content_length > 800 or bullet_count > 9)
+            needs_splitting = metrics.needs_split
             
             if needs_splitting and (slide.content or slide.bullets):
                 logger.info(f"Splitting content-heavy slide: {slide.title} ({content_length} chars, {bullet_count} bullets)")
@@ -267,15 +771,16 @@ class PPTBuilder:
                     midpoint = len(slide.content) // 2
                     
                     # First part
-                    first_slide = deepcopy(slide)
-                    first_slide.content = slide.content[:midpoint]
-                    first_slide.title = slide.title
+                    first_slide = slide.model_copy(
+                        update={"content": slide.content[:midpoint]}
+                    )
                     new_slides.append(first_slide)
                     
                     # Second part
-                    second_slide = deepcopy(slide)
-                    second_slide.content = slide.content[midpoint:]
-                    second_slide.title = f"{slide.title} (continued)"
+                    second_slide = slide.model_copy(update={
+                        "content": slide.content[midpoint:],
+                        "title": f"{slide.title} (continued)"
+                    })
                     new_slides.append(second_slide)
                     
                 elif slide.bullets and isinstance(slide.bullets, list):
@@ -283,30 +788,73 @@ class PPTBuilder:
                     midpoint = len(slide.bullets) // 2
                     
                     # First part
-                    first_slide = deepcopy(slide)
-                    first_slide.bullets = slide.bullets[:midpoint]
-                    first_slide.title = slide.title
+                    first_slide = slide.model_copy(
+                        update={"bullets": slide.bullets[:midpoint]}
+                    )
                     new_slides.append(first_slide)
                     
                     # Second part
-                    second_slide = deepcopy(slide)
-                    second_slide.bullets = slide.bullets[midpoint:]
-                    second_slide.title = f"{slide.title} (continued)"
+                    second_slide = slide.model_copy(update={
+                        "bullets": slide.bullets[midpoint:],
+                        "title": f"{slide.title} (continued)"
+                    })
                     new_slides.append(second_slide)
             else:
                 # No need to split
                 new_slides.append(slide)
         
-        # Update deck with new slide sequence
-        processed_deck.slides = new_slides
-        return processed_deck
-    
-    def _delete_slide(self, prs, slide_index):
-        """Delete slide by index"""
-        xml_slides = prs.slides._sldIdLst
-        slides = list(xml_slides)
-        xml_slides.remove(slides[slide_index])
+        # Build the processed deck around the new slide sequence
+        return deck.model_copy(update={"slides": new_slides})
     
+    def _prefetch_images(self, deck: Deck):
+        """Start downloading every image the deck will embed, overlapping rendering"""
+        # Ordered de-duplication: a URL shared by several slides is downloaded once
+        urls = list(dict.fromkeys(
+            slide.image_url or (slide.images[0] if slide.images else None)
+            for slide in deck.slides
+        ))
+        urls = [url for url in urls if url]
+
+        self._image_futures = {}
+        if not urls:
+            return
+
+        logger.info(f"Prefetching {len(urls)} images")
+        executor = ThreadPoolExecutor(
+            max_workers=min(IMAGE_PREFETCH_WORKERS, len(urls))
+        )
+        self._image_futures = {
+            url: executor.submit(self._download_image, url) for url in urls
+        }
+        # Already-submitted downloads keep running; the workers exit once the queue
+        # drains
+        executor.shutdown(wait=False)
+
+    def _download_image(self, image_url):
+        """Download a single image, returning None on failure"""
+        try:
+            return _prepare_image(_fetch_image_bytes(image_url))
+        except Exception as e:
+            logger.error(f"Failed to prefetch image {image_url}: {e}")
+            return None
+
+    def _get_image_stream(self, image_url) -> BytesIO:
+        """Prefetched image data, waiting for its download, or fetched on a miss"""
+        future = self._image_futures.get(image_url)
+        if future is not None:
+            content = future.result()
+            if content is None:
+                raise ValueError(f"Image download failed: {image_url}")
+            return BytesIO(content)
+
+        # Remember the prepared bytes so later slides with the same URL skip the
+        # fetch and resize
+        content = _prepare_image(_fetch_image_bytes(image_url))
+        future = Future()
+        future.set_result(content)
+        self._image_futures[image_url] = future
+        return BytesIO(content)
+
     def _create_enhanced_slide(self, prs, slide_data: Slide):
         """Create a slide with enhanced formatting"""
         slide_type = slide_data.type or 'content'
@@ -327,18 +875,20 @@ class PPTBuilder:
         title = slide.shapes.title
         title.text = slide_data.title
         title_paragraph = title.text_frame.paragraphs[0]
-        title_paragraph.font.size = Pt(44)
+        title_paragraph.font.size = _pt(44)
         title_paragraph.font.bold = True
         title_paragraph.font.color.rgb = self.colors['primary']
         title_paragraph.alignment = PP_ALIGN.CENTER
         
-        # Subtitle formatting
-        if len(slide.placeholders) > 1:
+        # Subtitle formatting (the placeholder is left untouched when there is
+        # nothing to show)
+        subtitle_text = slide_data.subtitle or slide_data.notes
+        if subtitle_text and len(slide.placeholders) > 1:
             subtitle = slide.placeholders[1]
-            subtitle.text = slide_data.subtitle or slide_data.notes or ""
+            subtitle.text = subtitle_text
             if subtitle.text:
                 subtitle_paragraph = subtitle.text_frame.paragraphs[0]
-                subtitle_paragraph.font.size = Pt(24)
+                subtitle_paragraph.font.size = _pt(24)
                 subtitle_paragraph.font.color.rgb = self.colors['secondary']
                 subtitle_paragraph.alignment = PP_ALIGN.CENTER
     
@@ -354,7 +904,9 @@ class PPTBuilder:
         
         # Determine layout based on content
         has_image = slide_data.image_url or (slide_data.images and len(slide_data.images) > 0)
-        has_diagram = slide_data.diagram_type and slide_data.diagram_data
+        has_diagram = self._diagram_data_sufficient(
+            slide_data.diagram_type, slide_data.diagram_data
+        )
         
         if has_image and has_diagram:
             # Both image and diagram - use compact layout
@@ -370,7 +922,7 @@ class PPTBuilder:
             self._create_text_only_layout(slide, slide_data)
         
         # Add notes
-        if slide_data.notes:
+        if slide_data.notes and slide_data.notes.strip():
             slide.notes_slide.notes_text_frame.text = slide_data.notes
     
     def _create_text_only_layout(self, slide, slide_data: Slide):
@@ -380,29 +932,32 @@ class PPTBuilder:
         
         # Adaptive content area sizing
         if text_density > 0.8:  # Very dense content
-            left, width = Inches(0.3), Inches(9.4)
-            top, height = Inches(1.3), Inches(5.4)
+            left, width = _inches(0.3), _inches(9.4)
+            top, height = _inches(1.3), _inches(5.4)
         elif text_density > 0.5:  # Dense content
-            left, width = Inches(0.4), Inches(9.2)
-            top, height = Inches(1.4), Inches(5.2)
+            left, width = _inches(0.4), _inches(9.2)
+            top, height = _inches(1.4), _inches(5.2)
         else:  # Normal content
-            left, width = Inches(0.5), Inches(9.0)
-            top, height = Inches(1.5), Inches(5.0)
+            left, width = _inches(0.5), _inches(9.0)
+            top, height = _inches(1.5), _inches(5.0)
         
         content_placeholder = slide.placeholders[1] if len(slide.placeholders) > 1 else None
         
         if content_placeholder:
-            # Configure content area with adaptive dimensions
-            content_placeholder.left = left
-            content_placeholder.width = width
-            content_placeholder.top = top
-            content_placeholder.height = height
-            
             # Enhanced content handling based on density
             if text_density > 0.7:
-                # Very dense content - use overflow-safe textbox
+                # Very dense content - the overflow-safe textbox replaces the
+                # placeholder
+                sp = content_placeholder._element
+                sp.getparent().remove(sp)
                 self._create_overflow_safe_textbox(slide, slide_data)
             else:
+                # Configure content area with adaptive dimensions
+                content_placeholder.left = left
+                content_placeholder.width = width
+                content_placeholder.top = top
+                content_placeholder.height = height
+
                 # Normal content handling with enhanced formatting
                 if slide_data.content:
                     self._add_enhanced_bullet_points(content_placeholder, slide_data.content)
@@ -422,27 +977,27 @@ class PPTBuilder:
         
         # Adaptive text area sizing based on content volume
         if text_density > 0.7:  # High density content
-            text_width = Inches(5.2)
-            image_width = Inches(3.3)
-            image_left = Inches(5.7)
+            text_width = _inches(5.2)
+            image_width = _inches(3.3)
+            image_left = _inches(5.7)
         elif text_density > 0.4:  # Medium density content
-            text_width = Inches(4.8)
-            image_width = Inches(3.7)
-            image_left = Inches(5.3)
+            text_width = _inches(4.8)
+            image_width = _inches(3.7)
+            image_left = _inches(5.3)
         else:  # Low density content
-            text_width = Inches(4.3)
-            image_width = Inches(4.2)
-            image_left = Inches(4.8)
+            text_width = _inches(4.3)
+            image_width = _inches(4.2)
+            image_left = _inches(4.8)
         
         # Create or adjust content area
         content_placeholder = slide.placeholders[1] if len(slide.placeholders) > 1 else None
         
         if content_placeholder:
             # Adaptive content area positioning
-            content_placeholder.left = Inches(0.4)
+            content_placeholder.left = _inches(0.4)
             content_placeholder.width = text_width
-            content_placeholder.top = Inches(1.4)
-            content_placeholder.height = Inches(5.2)
+            content_placeholder.top = _inches(1.4)
+            content_placeholder.height = _inches(5.2)
             
             # Enhanced content handling with adaptive truncation
             if slide_data.content:
@@ -451,13 +1006,15 @@ class PPTBuilder:
                 self._add_simple_bullet_points(content_placeholder, slide_data.bullets)
         else:
             # Create custom text box if no placeholder available
-            txBox = slide.shapes.add_textbox(Inches(0.4), Inches(1.4), text_width, Inches(5.2))
+            txBox = slide.shapes.add_textbox(
+                _inches(0.4), _inches(1.4), text_width, _inches(5.2)
+            )
             tf = txBox.text_frame
             tf.word_wrap = True
-            tf.margin_left = Pt(18)
-            tf.margin_right = Pt(18)
-            tf.margin_top = Pt(12)
-            tf.margin_bottom = Pt(12)
+            tf.margin_left = _pt(18)
+            tf.margin_right = _pt(18)
+            tf.margin_top = _pt(12)
+            tf.margin_bottom = _pt(12)
             
             # Add content with proper formatting
             if slide_data.content:
@@ -468,8 +1025,10 @@ class PPTBuilder:
         # Add image with calculated positioning
         image_url = slide_data.image_url or (slide_data.images[0] if slide_data.images else None)
         if image_url:
-            self._add_image_to_slide(slide, image_url, position='right', 
-                                   custom_pos=(image_left, Inches(1.6), image_width, Inches(4.8)))
+            self._add_image_to_slide(
+                slide, image_url, position='right',
+                custom_pos=(image_left, _inches(1.6), image_width, _inches(4.8))
+            )
     
     def _create_diagram_content_layout(self, slide, slide_data: Slide):
         """Create layout with diagram and minimal text"""
@@ -478,17 +1037,17 @@ class PPTBuilder:
         
         if content_placeholder:
             # Compact content area at top
-            content_placeholder.left = Inches(0.5)
-            content_placeholder.width = Inches(9)
-            content_placeholder.top = Inches(1.5)
-            content_placeholder.height = Inches(2)
+            content_placeholder.left = _inches(0.5)
+            content_placeholder.width = _inches(9)
+            content_placeholder.top = _inches(1.5)
+            content_placeholder.height = _inches(2)
             
             # Show only first 3 points to save space
-            content = slide_data.content[:3] if slide_data.content else slide_data.bullets[:3]
+            points = slide_data.content or slide_data.bullets or []
             if slide_data.content:
-                self._add_enhanced_bullet_points(content_placeholder, content)
+                self._add_enhanced_bullet_points(content_placeholder, points[:3])
             else:
-                self._add_simple_bullet_points(content_placeholder, content)
+                self._add_simple_bullet_points(content_placeholder, points[:3])
         
         # Add diagram below text
         self._add_diagram_to_slide(slide, slide_data)
@@ -500,36 +1059,34 @@ class PPTBuilder:
         
         # Adaptive layout dimensions
         if text_density > 0.6:  # High density - prioritize text space
-            text_width = Inches(4.2)
-            text_height = Inches(2.3)
-            image_size = (Inches(2.5), Inches(1.8))
-            image_pos = (Inches(6.8), Inches(1.6))
+            text_width = _inches(4.2)
+            text_height = _inches(2.3)
+            image_size = (_inches(2.5), _inches(1.8))
+            image_pos = (_inches(6.8), _inches(1.6))
         else:  # Lower density - balanced layout
-            text_width = Inches(3.8)
-            text_height = Inches(2.0)
-            image_size = (Inches(2.8), Inches(2.0))
-            image_pos = (Inches(6.5), Inches(1.6))
+            text_width = _inches(3.8)
+            text_height = _inches(2.0)
+            image_size = (_inches(2.8), _inches(2.0))
+            image_pos = (_inches(6.5), _inches(1.6))
         
         # Enhanced text area positioning
         content_placeholder = slide.placeholders[1] if len(slide.placeholders) > 1 else None
         
         if content_placeholder:
             # Optimized content area positioning
-            content_placeholder.left = Inches(0.4)
+            content_placeholder.left = _inches(0.4)
             content_placeholder.width = text_width
-            content_placeholder.top = Inches(1.4)
+            content_placeholder.top = _inches(1.4)
             content_placeholder.height = text_height
             
             # Selective content based on density
-            if text_density > 0.7:
-                content = slide_data.content[:1] if slide_data.content else slide_data.bullets[:2]
-            else:
-                content = slide_data.content[:2] if slide_data.content else slide_data.bullets[:3]
-                
+            points = slide_data.content or slide_data.bullets or []
             if slide_data.content:
-                self._add_enhanced_bullet_points(content_placeholder, content)
+                limit = 1 if text_density > 0.7 else 2
+                self._add_enhanced_bullet_points(content_placeholder, points[:limit])
             else:
-                self._add_simple_bullet_points(content_placeholder, content)
+                limit = 2 if text_density > 0.7 else 3
+                self._add_simple_bullet_points(content_placeholder, points[:limit])
         
         # Add compact image with calculated positioning
         image_url = slide_data.image_url or (slide_data.images[0] if slide_data.images else None)
@@ -537,7 +1094,9 @@ class PPTBuilder:
             self._add_compact_image_to_slide(slide, image_url, custom_pos=(*image_pos, *image_size))
         
         # Add compact diagram positioned to avoid overlap
-        self._add_compact_diagram_to_slide(slide, slide_data, offset_top=text_height + Inches(0.3))
+        self._add_compact_diagram_to_slide(
+            slide, slide_data, offset_top=text_height + _inches(0.3)
+        )
     
     def _create_conclusion_slide(self, prs, slide_data: Slide):
         """Create conclusion slide"""
@@ -547,11 +1106,11 @@ class PPTBuilder:
         """Format slide title with enhanced adaptive sizing and styling"""
         text_frame = title_shape.text_frame
         text_frame.word_wrap = True
-        text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
-        text_frame.margin_left = Pt(12)
-        text_frame.margin_right = Pt(12)
-        text_frame.margin_top = Pt(8)
-        text_frame.margin_bottom = Pt(8)
+        text_frame.auto_size = _AUTO_FIT
+        text_frame.margin_left = _pt(12)
+        text_frame.margin_right = _pt(12)
+        text_frame.margin_top = _pt(8)
+        text_frame.margin_bottom = _pt(8)
         
         # Apply enhanced formatting to paragraph
         title_paragraph = text_frame.paragraphs[0] 
@@ -567,12 +1126,12 @@ class PPTBuilder:
         else:
             font_size = 40  # Short titles
         
-        title_paragraph.font.size = Pt(font_size)
+        title_paragraph.font.size = _pt(font_size)
         title_paragraph.font.bold = True
         title_paragraph.font.color.rgb = self.colors['primary']
         title_paragraph.alignment = PP_ALIGN.LEFT
         title_paragraph.line_spacing = 1.1
-        title_paragraph.space_after = Pt(6)
+        title_paragraph.space_after = _pt(6)
     
     def _add_enhanced_bullet_points(self, content_shape, bullet_points):
         """Add formatted bullet points with enhanced structure and text overflow prevention"""
@@ -581,15 +1140,14 @@ class PPTBuilder:
         
         # Enhanced text frame configuration for better formatting
         text_frame.word_wrap = True
-        text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
-        text_frame.margin_left = Pt(18)
-        text_frame.margin_right = Pt(18) 
-        text_frame.margin_top = Pt(12)
-        text_frame.margin_bottom = Pt(12)
+        text_frame.auto_size = _AUTO_FIT
+        text_frame.margin_left = _pt(18)
+        text_frame.margin_right = _pt(18)
+        text_frame.margin_top = _pt(12)
+        text_frame.margin_bottom = _pt(12)
         
         # Calculate adaptive maximum points based on content complexity
-        total_text_length = sum(len(str(point.get('text', str(point)) if isinstance(point, dict) else 
-                                   getattr(point, 'text', str(point)))) for point in bullet_points)
+        total_text_length = sum(map(len, map(_point_text, bullet_points)))
         
         # Adaptive content limits based on total text volume
         if total_text_length > 2000:
@@ -605,56 +1163,11 @@ class PPTBuilder:
             max_points = 7  # Light content
             max_sub_points = 4
         
-        for i, point in enumerate(bullet_points[:max_points]):
-            if isinstance(point, dict):
-                # Handle BulletPoint structure
-                main_text = point.get('text', str(point))
-                sub_points = point.get('sub_points', [])
-                level = point.get('level', 0)
-            elif hasattr(point, 'text'):  # BulletPoint object
-                main_text = point.text
-                sub_points = point.sub_points or []
-                level = point.level
-            else:
-                # Handle simple string
-                main_text = str(point)
-                sub_points = []
-                level = 0
-            
-            # Adaptive text truncation based on position and level
-            if level == 0:
-                max_length = 180 if i < 3 else 120  # First 3 points get more space
-            else:
-                max_length = 100
-                
-            if len(main_text) > max_length:
-                main_text = main_text[:max_length-3] + "..."
-                
-            # Add main bullet point
-            if i == 0:
-                p = text_frame.paragraphs[0]
-            else:
-                p = text_frame.add_paragraph()
-            
-            p.text = main_text
-            p.level = level
-            self._format_bullet_point(p, level)
-            
-            # Add sub-points with improved formatting
-            if sub_points and level < 2:  # Limit nesting depth
-                for j, sub_point in enumerate(sub_points[:max_sub_points]):
-                    sub_text = str(sub_point)
-                    
-                    # Progressive truncation for sub-points
-                    sub_max_length = max(80 - (j * 10), 40)  # Shorter for later sub-points
-                    if len(sub_text) > sub_max_length:
-                        sub_text = sub_text[:sub_max_length-3] + "..."
-                    
-                    sub_p = text_frame.add_paragraph()
-                    sub_p.text = sub_text
-                    sub_p.level = level + 1
-                    self._format_bullet_point(sub_p, level + 1)
-                    
+        # Flatten main points and sub-points into truncated paragraphs in one pass
+        flat_points = self._normalize_bullets(bullet_points, max_points, max_sub_points)
+
+        self._write_bullet_paragraphs(text_frame, flat_points)
+
         # Add content summary indicator if truncated
         if len(bullet_points) > max_points:
             p = text_frame.add_paragraph()
@@ -662,8 +1175,32 @@ class PPTBuilder:
             p.text = f"... and {remaining} more point{'s' if remaining > 1 else ''}"
             p.level = 0
             p.font.italic = True
-            p.font.size = Pt(12)
+            p.font.size = _pt(12)
             p.font.color.rgb = self.colors['light_text']
+
+    def _normalize_bullets(self, bullet_points, max_points, max_sub_points) -> list:
+        """Flatten bullet points into (text, level) pairs with adaptive truncation"""
+        flat_points = []
+        points = bullet_points[:max_points]
+        extract = _pick_extractor(points)
+        for i, point in enumerate(points):
+            main_text, sub_points, level = extract(point)
+            
+            # Adaptive text truncation based on position and level
+            if level == 0:
+                max_length = 180 if i < 3 else 120  # First 3 points get more space
+            else:
+                max_length = 100
+            flat_points.append((_truncate(main_text, max_length), level))
+            
+            # Sub-points get progressively shorter limits; nesting depth is capped
+            if sub_points and level < 2:
+                for j, sub_point in enumerate(sub_points[:max_sub_points]):
+                    sub_max_length = max(80 - (j * 10), 40)
+                    sub_text = _truncate(str(sub_point), sub_max_length)
+                    flat_points.append((sub_text, level + 1))
+
+        return flat_points
     
     def _add_simple_bullet_points(self, content_shape, bullets):
         """Add simple bullet points with enhanced auto-fit and adaptive formatting"""
@@ -672,11 +1209,11 @@ class PPTBuilder:
         
         # Enhanced text frame configuration
         text_frame.word_wrap = True
-        text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
-        text_frame.margin_left = Pt(18)
-        text_frame.margin_right = Pt(18)
-        text_frame.margin_top = Pt(12)
-        text_frame.margin_bottom = Pt(12)
+        text_frame.auto_size = _AUTO_FIT
+        text_frame.margin_left = _pt(18)
+        text_frame.margin_right = _pt(18)
+        text_frame.margin_top = _pt(12)
+        text_frame.margin_bottom = _pt(12)
         
         # Calculate total content length for adaptive limits
         total_length = sum(len(str(bullet)) for bullet in bullets)
@@ -695,20 +1232,12 @@ class PPTBuilder:
             max_bullets = 8
             max_length_per_bullet = 220
         
-        for i, bullet in enumerate(bullets[:max_bullets]):
-            if i == 0:
-                p = text_frame.paragraphs[0]
-            else:
-                p = text_frame.add_paragraph()
-            
-            # Adaptive text truncation
-            bullet_text = str(bullet)
-            if len(bullet_text) > max_length_per_bullet:
-                bullet_text = bullet_text[:max_length_per_bullet-3] + "..."
-                
-            p.text = bullet_text
-            p.level = 0
-            self._format_bullet_point(p, 0)
+        # Adaptive text truncation
+        flat_points = [
+            (_truncate(str(bullet), max_length_per_bullet), 0)
+            for bullet in bullets[:max_bullets]
+        ]
+        self._write_bullet_paragraphs(text_frame, flat_points)
         
         # Add summary if content was truncated
         if len(bullets) > max_bullets:
@@ -716,7 +1245,7 @@ class PPTBuilder:
             remaining = len(bullets) - max_bullets
             p.text = f"... plus {remaining} additional point{'s' if remaining > 1 else ''}"
             p.font.italic = True
-            p.font.size = Pt(12)
+            p.font.size = _pt(12)
             p.font.color.rgb = self.colors['light_text']
     
     def _add_paragraph_content(self, content_shape, slide_data: Slide):
@@ -726,11 +1255,11 @@ class PPTBuilder:
         
         # Enhanced text frame configuration
         text_frame.word_wrap = True
-        text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
-        text_frame.margin_left = Pt(20)
-        text_frame.margin_right = Pt(20)
-        text_frame.margin_top = Pt(15)
-        text_frame.margin_bottom = Pt(15)
+        text_frame.auto_size = _AUTO_FIT
+        text_frame.margin_left = _pt(20)
+        text_frame.margin_right = _pt(20)
+        text_frame.margin_top = _pt(15)
+        text_frame.margin_bottom = _pt(15)
         
         # Handle different content types as paragraphs
         content_text = ""
@@ -752,15 +1281,15 @@ class PPTBuilder:
                     p = text_frame.add_paragraph()
                 
                 p.text = para_text
-                p.font.size = Pt(18)
+                p.font.size = _pt(18)
                 p.font.color.rgb = self.colors['text']
                 p.alignment = PP_ALIGN.LEFT
                 p.line_spacing = 1.3
-                p.space_after = Pt(12)  # Space between paragraphs
+                p.space_after = _pt(12)  # Space between paragraphs
                 
                 # First paragraph slightly larger
                 if i == 0:
-                    p.font.size = Pt(20)
+                    p.font.size = _pt(20)
                     p.font.bold = True
     
     def _split_into_paragraphs(self, text: str) -> list:
@@ -788,101 +1317,135 @@ class PPTBuilder:
         
         return paragraphs
     
+    def _write_bullet_paragraphs(self, text_frame, flat_points):
+        """Fill a cleared text frame with formatted (text, level) bullet paragraphs"""
+        if not flat_points:
+            return
+
+        if any(_CONTROL_CHARS.search(text) for text, _ in flat_points):
+            # Slow path: let python-pptx translate line breaks and escape control
+            # characters
+            for i, (text, level) in enumerate(flat_points):
+                p = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+                p.text = text
+                p.level = level
+                self._format_bullet_point(p, level)
+            return
+
+        # Serialize every paragraph and insert them with a single parse
+        paragraphs_xml = "".join(
+            self._bullet_paragraph_xml(text, level) for text, level in flat_points
+        )
+        _replace_paragraphs(text_frame, paragraphs_xml)
+
+    def _bullet_paragraph_xml(self, text: str, level: int) -> str:
+        """Serialize one bullet paragraph formatted like _format_bullet_point"""
+        bucket = bisect_left(BULLET_LENGTH_BOUNDS, len(text))
+        font_size, color = self._bullet_styles[(min(level, 3), bucket)]
+        if level == 0:
+            emphasis = ' b="1"'
+        elif level == 1:
+            emphasis = ' i="1"'
+        else:
+            emphasis = ''
+        return _BULLET_PARAGRAPH_XML.format(
+            lvl=f' lvl="{level}"' if level else '',
+            space_after=600 if level == 0 else 300,
+            size=font_size.centipoints,
+            emphasis=emphasis,
+            color=str(color),
+            run=_text_run_xml(text),
+        )
+
     def _format_bullet_point(self, paragraph, level=0):
         """Format individual bullet point with adaptive sizing and proper spacing"""
-        # Enhanced base font sizes for different levels
-        base_font_sizes = [18, 16, 14, 12]  # More granular sizing
-        colors = [self.colors['text'], self.colors['light_text'], self.colors['light_text'], self.colors['light_text']]
-        
-        # Adjust font size based on text length for better fitting
-        text_length = len(paragraph.text)
-        
-        # Calculate adaptive font size with improved scaling
-        level_idx = min(level, len(base_font_sizes) - 1)
-        base_size = base_font_sizes[level_idx]
-        
-        # More sophisticated adaptive sizing
-        if text_length > 200:
-            font_size = max(base_size - 6, 10)  # Very long text
-        elif text_length > 150:
-            font_size = max(base_size - 4, 12)  # Long text
-        elif text_length > 100:
-            font_size = max(base_size - 2, 14)  # Medium text
-        elif text_length > 50:
-            font_size = max(base_size - 1, 16)  # Short-medium text
-        else:
-            font_size = base_size  # Short text
-            
+        # Font size shrinks as the text gets longer; resolved from the precomputed table
+        bucket = bisect_left(BULLET_LENGTH_BOUNDS, len(paragraph.text))
+        font_size, color = self._bullet_styles[(min(level, 3), bucket)]
+
         # Enhanced paragraph formatting
         paragraph.alignment = PP_ALIGN.LEFT
-        paragraph.font.size = Pt(font_size)
-        paragraph.font.color.rgb = colors[min(level, len(colors) - 1)]
+        font = paragraph.font
+        font.size = font_size
+        font.color.rgb = color
         
         # Improved spacing and formatting
-        paragraph.space_before = Pt(3)  # Space before paragraph
-        paragraph.space_after = Pt(6) if level == 0 else Pt(3)  # More space after main points
+        paragraph.space_before = _pt(3)  # Space before paragraph
+        # More space after main points
+        paragraph.space_after = _pt(6) if level == 0 else _pt(3)
         paragraph.line_spacing = 1.2  # Better line spacing
         
         # Enhanced text formatting based on level
         if level == 0:
-            paragraph.font.bold = True
+            font.bold = True
         elif level == 1:
-            paragraph.font.italic = True  # Italics for sub-points
+            font.italic = True  # Italics for sub-points
         
         # Add proper indentation
-        paragraph.left_indent = Inches(0.25 * level)  # Progressive indentation
+        paragraph.left_indent = _inches(0.25 * level)  # Progressive indentation
     
-    def _calculate_text_density(self, slide_data: Slide) -> float:
-        """Calculate text density ratio for adaptive layout decisions"""
-        total_length = len(slide_data.title) if slide_data.title else 0
-        content_items = 0
+    def _compute_slide_metrics(self, slide_data: Slide) -> SlideMetrics:
+        """Walk a slide's text once and derive every size metric the builder needs"""
+        content_chars = 0
+        item_count = 0
         
         if slide_data.content:
-            content_items = len(slide_data.content)
+            item_count = len(slide_data.content)
+            content_chars = sum(map(len, map(_point_text, slide_data.content)))
             for point in slide_data.content:
-                if hasattr(point, 'text'):
-                    if hasattr(point.text, '__len__'):
-                        total_length += len(point.text)
-                    else:
-                        total_length += len(str(point.text))
-                    if hasattr(point, 'sub_points') and point.sub_points:
-                        content_items += len(point.sub_points)
-                        for sub in point.sub_points:
-                            total_length += len(str(sub))
-                else:
-                    total_length += len(str(point))
+                if isinstance(point, BulletPoint) and point.sub_points:
+                    item_count += len(point.sub_points)
+                    content_chars += sum(map(len, map(str, point.sub_points)))
         elif slide_data.bullets:
-            content_items = len(slide_data.bullets)
-            total_length += sum(len(str(bullet)) for bullet in slide_data.bullets)
+            item_count = len(slide_data.bullets)
+            content_chars = sum(map(len, map(str, slide_data.bullets)))
         
         # Calculate density ratio (0-1 scale)
         # Base calculation on both text length and number of items
+        title_length = len(slide_data.title) if slide_data.title else 0
+        total_length = title_length + content_chars
         length_factor = min(total_length / 1000, 1.0)  # Normalize to 1000 chars
-        items_factor = min(content_items / 10, 1.0)    # Normalize to 10 items
+        items_factor = min(item_count / 10, 1.0)       # Normalize to 10 items
         
         # Weighted average (text length weighted more heavily)
-        density = (length_factor * 0.7) + (items_factor * 0.3)
-        return min(density, 1.0)
+        density = min((length_factor * 0.7) + (items_factor * 0.3), 1.0)
+
+        return SlideMetrics(
+            content_chars=content_chars,
+            item_count=item_count,
+            density=density,
+            is_dense=density > 0.6,  # Threshold for dense content
+            needs_split=content_chars > 800 or item_count > 9,
+        )
+
+    def _get_slide_metrics(self, slide_data: Slide) -> SlideMetrics:
+        """Return cached metrics for a slide, computing them on first use"""
+        entry = self._slide_metrics.get(id(slide_data))
+        if entry is None or entry[0] is not slide_data:
+            entry = (slide_data, self._compute_slide_metrics(slide_data))
+            self._slide_metrics[id(slide_data)] = entry
+        return entry[1]
+
+    def _calculate_text_density(self, slide_data: Slide) -> float:
+        """Calculate text density ratio for adaptive layout decisions"""
+        return self._get_slide_metrics(slide_data).density
     
     def _is_content_dense(self, slide_data: Slide) -> bool:
         """Determine if slide content is very dense and needs special handling"""
-        density = self._calculate_text_density(slide_data)
-        return density > 0.6  # Threshold for dense content
+        return self._get_slide_metrics(slide_data).is_dense
     
     def _create_overflow_safe_textbox(self, slide, slide_data: Slide):
         """Create a custom text box that ensures content never overflows slide boundaries"""
-        from pptx.util import Pt, Inches
-        
         # Create a custom text box with strict boundaries
-        left = Inches(0.5)
-        top = Inches(1.5)
-        width = Inches(9)
-        height = Inches(5)
+        left = _inches(0.5)
+        top = _inches(1.5)
+        width = _inches(9)
+        height = _inches(5)
         
         txBox = slide.shapes.add_textbox(left, top, width, height)
         tf = txBox.text_frame
         tf.word_wrap = True
-        tf.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+        tf.auto_size = _AUTO_FIT
         tf.margin_left = 0
         tf.margin_right = 0
         tf.margin_top = 0
@@ -894,83 +1457,84 @@ class PPTBuilder:
         if slide_data.content:
             # Use more aggressive truncation for dense slides
             max_points = min(6, len(slide_data.content))
-            for i, point in enumerate(slide_data.content[:max_points]):
-                if i == 0:
-                    p = tf.paragraphs[0]
-                else:
-                    p = tf.add_paragraph()
-                
-                # Extract point text with strict length limits
-                if hasattr(point, 'text'):
-                    if hasattr(point.text, '__len__'):
-                        point_text = point.text[:150] + "..." if len(point.text) > 150 else point.text
-                    else:
-                        point_text = str(point.text)
-                else:
-                    point_text = str(point)[:150] + "..." if len(str(point)) > 150 else str(point)
-                    
-                p.text = point_text
-                p.level = 0
-                
-                # Apply compact formatting
-                font = p.font
-                font.size = Pt(16)  # Smaller font for dense slides
-                font.bold = True
-                
-                # Handle sub-points more aggressively for dense slides
-                if hasattr(point, 'sub_points') and point.sub_points:
-                    # Limit to 2 sub-points for dense slides
-                    max_sub = min(2, len(point.sub_points))
-                    for j, sub in enumerate(point.sub_points[:max_sub]):
-                        sub_p = tf.add_paragraph()
-                        sub_text = str(sub)[:100] + "..." if len(str(sub)) > 100 else str(sub)
-                        sub_p.text = sub_text
-                        sub_p.level = 1
-                        
-                        # Apply compact formatting for sub-points
-                        sub_font = sub_p.font
-                        sub_font.size = Pt(14)
-                        sub_font.bold = False
-            
-            # Add ellipsis if content was truncated
+            items = []
+            for point in slide_data.content[:max_points]:
+                items.append((_point_text(point), 0))
+                # Limit to 2 sub-points for dense slides
+                if isinstance(point, BulletPoint) and point.sub_points:
+                    items.extend((str(sub), 1) for sub in point.sub_points[:2])
+            condensed_note = None
             if len(slide_data.content) > max_points:
-                p = tf.add_paragraph()
-                p.text = "(Additional content has been condensed)"
-                p.font.italic = True
-                p.font.size = Pt(12)
-        
+                condensed_note = "(Additional content has been condensed)"
         elif slide_data.bullets:
             # Process simple bullets with strict truncation
             max_bullets = min(8, len(slide_data.bullets))
-            for i, bullet in enumerate(slide_data.bullets[:max_bullets]):
-                if i == 0:
-                    p = tf.paragraphs[0]
-                else:
-                    p = tf.add_paragraph()
-                
-                # Truncate long bullets
-                bullet_text = str(bullet)[:150] + "..." if len(str(bullet)) > 150 else str(bullet)
-                p.text = bullet_text
-                
-                # Apply compact formatting
+            items = [(str(bullet), 0) for bullet in slide_data.bullets[:max_bullets]]
+            condensed_note = None
+            if len(slide_data.bullets) > max_bullets:
+                condensed_note = "(Additional bullets have been condensed)"
+        else:
+            return
+
+        # Pick the largest font that fits; only truncate when even the smallest size
+        # overflows
+        available_height = height.pt - (20 if condensed_note else 0)
+        total_chars = sum(len(text) for text, _ in items)
+        few_items = len(items) <= OVERFLOW_FAST_PATH_ITEMS
+        if few_items and total_chars < OVERFLOW_FAST_PATH_CHARS:
+            # Trivially short content always fits at the largest size; skip the
+            # measuring search
+            base_size = FIT_FONT_MAX
+        else:
+            base_size = _fit_font_size(items, width.pt, available_height)
+        if base_size is None:
+            items = [
+                (_truncate(text, 100 if level else 150), level) for text, level in items
+            ]
+            refit_size = _fit_font_size(items, width.pt, available_height)
+            base_size = refit_size or FIT_FONT_MIN
+
+        if any(_CONTROL_CHARS.search(text) for text, _ in items):
+            # Slow path: let python-pptx translate line breaks and escape control
+            # characters
+            for i, (text, level) in enumerate(items):
+                p = tf.paragraphs[0] if i == 0 else tf.add_paragraph()
+                p.text = text
+                p.level = level
+
+                # Apply compact formatting; sub-points are two points smaller
                 font = p.font
-                font.size = Pt(16)
+                font.size = Pt(base_size - 2 if level else base_size)
+                if slide_data.content:
+                    font.bold = not level
             
-            # Add ellipsis if bullets were truncated
-            if len(slide_data.bullets) > max_bullets:
+            # Add ellipsis if content was truncated
+            if condensed_note:
                 p = tf.add_paragraph()
-                p.text = "(Additional bullets have been condensed)"
+                p.text = condensed_note
                 p.font.italic = True
-                p.font.size = Pt(12)
+                p.font.size = _pt(12)
+            return
+
+        # Serialize all paragraphs (plus the condensed note) and insert them at once
+        paragraphs = []
+        for text, level in items:
+            attrs = f' sz="{Pt(base_size - 2 if level else base_size).centipoints}"'
+            if slide_data.content:
+                attrs += ' b="0"' if level else ' b="1"'
+            paragraphs.append(_COMPACT_PARAGRAPH_XML.format(
+                lvl=f' lvl="{level}"' if level else '', attrs=attrs,
+                run=_text_run_xml(text)))
+        if condensed_note:
+            paragraphs.append(_COMPACT_PARAGRAPH_XML.format(
+                lvl='', attrs=' i="1" sz="1200"', run=_text_run_xml(condensed_note)))
+        _replace_paragraphs(tf, "".join(paragraphs))
     
     def _add_image_to_slide(self, slide, image_url, position='right', custom_pos=None):
         """Add image to slide with enhanced positioning and adaptive sizing"""
         try:
-            # Download image
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            
-            image_stream = BytesIO(response.content)
+            # Download image (served from the prefetch cache when available)
+            image_stream = self._get_image_stream(image_url)
             
             # Calculate position with custom positioning support
             if custom_pos:
@@ -978,29 +1542,29 @@ class PPTBuilder:
             else:
                 # Default position calculations with improved spacing
                 if position == 'right':
-                    left = Inches(5.6)  # Slightly more right for better spacing
-                    top = Inches(1.6)   # Slightly higher
-                    width = Inches(3.9)
-                    height = Inches(4.8)
+                    left = _inches(5.6)  # Slightly more right for better spacing
+                    top = _inches(1.6)   # Slightly higher
+                    width = _inches(3.9)
+                    height = _inches(4.8)
                 elif position == 'center':
-                    left = Inches(2.8)
-                    top = Inches(4.2)   # Below text content with more margin
-                    width = Inches(4.4)
-                    height = Inches(2.8)
+                    left = _inches(2.8)
+                    top = _inches(4.2)   # Below text content with more margin
+                    width = _inches(4.4)
+                    height = _inches(2.8)
                 else:  # left
-                    left = Inches(0.2)
-                    top = Inches(1.6)
-                    width = Inches(3.9)
-                    height = Inches(4.8)
+                    left = _inches(0.2)
+                    top = _inches(1.6)
+                    width = _inches(3.9)
+                    height = _inches(4.8)
             
             # Validate image dimensions to prevent off-slide placement
-            slide_width = Inches(10)
-            slide_height = Inches(7.5)
+            slide_width = _inches(10)
+            slide_height = _inches(7.5)
             
             if left + width > slide_width:
-                width = slide_width - left - Inches(0.1)  # Leave small margin
+                width = slide_width - left - _inches(0.1)  # Leave small margin
             if top + height > slide_height:
-                height = slide_height - top - Inches(0.1)  # Leave small margin
+                height = slide_height - top - _inches(0.1)  # Leave small margin
             
             # Add image with validated dimensions
             slide.shapes.add_picture(image_stream, left, top, width, height)
@@ -1016,28 +1580,25 @@ class PPTBuilder:
     def _add_compact_image_to_slide(self, slide, image_url, custom_pos=None):
         """Add smaller image for mixed layouts with enhanced positioning"""
         try:
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            
-            image_stream = BytesIO(response.content)
+            image_stream = self._get_image_stream(image_url)
             
             # Use custom positioning if provided, otherwise default
             if custom_pos:
                 left, top, width, height = custom_pos
             else:
-                left = Inches(6.5)  # Adjusted for better spacing
-                top = Inches(1.6)
-                width = Inches(2.8)
-                height = Inches(2.0)
+                left = _inches(6.5)  # Adjusted for better spacing
+                top = _inches(1.6)
+                width = _inches(2.8)
+                height = _inches(2.0)
             
             # Validate dimensions to prevent overflow
-            slide_width = Inches(10)
-            slide_height = Inches(7.5)
+            slide_width = _inches(10)
+            slide_height = _inches(7.5)
             
             if left + width > slide_width:
-                width = slide_width - left - Inches(0.1)
+                width = slide_width - left - _inches(0.1)
             if top + height > slide_height:
-                height = slide_height - top - Inches(0.1)
+                height = slide_height - top - _inches(0.1)
             
             slide.shapes.add_picture(image_stream, left, top, width, height)
             
@@ -1053,16 +1614,18 @@ class PPTBuilder:
         if custom_pos:
             left, top, width, height = custom_pos
         else:
-            left, top, width, height = Inches(6.5), Inches(1.6), Inches(2.8), Inches(2.0)
+            left, top, width, height = (
+                _inches(6.5), _inches(1.6), _inches(2.8), _inches(2.0)
+            )
         
         # Validate dimensions
-        slide_width = Inches(10)
-        slide_height = Inches(7.5)
+        slide_width = _inches(10)
+        slide_height = _inches(7.5)
         
         if left + width > slide_width:
-            width = slide_width - left - Inches(0.1)
+            width = slide_width - left - _inches(0.1)
         if top + height > slide_height:
-            height = slide_height - top - Inches(0.1)
+            height = slide_height - top - _inches(0.1)
         
         shape = slide.shapes.add_shape(
             MSO_SHAPE.RECTANGLE, left, top, width, height
@@ -1070,20 +1633,20 @@ class PPTBuilder:
         shape.fill.solid()
         shape.fill.fore_color.rgb = RGBColor(248, 249, 250)
         shape.line.color.rgb = RGBColor(206, 212, 218)
-        shape.line.width = Pt(1)
-        
+        shape.line.width = _pt(1)
+
         text_frame = shape.text_frame
         text_frame.text = "🖼️\nImage"
-        text_frame.margin_left = Pt(8)
-        text_frame.margin_right = Pt(8)
-        text_frame.margin_top = Pt(8)
-        text_frame.margin_bottom = Pt(8)
-        
+        text_frame.margin_left = _pt(8)
+        text_frame.margin_right = _pt(8)
+        text_frame.margin_top = _pt(8)
+        text_frame.margin_bottom = _pt(8)
+
         for paragraph in text_frame.paragraphs:
             paragraph.alignment = PP_ALIGN.CENTER
-            paragraph.font.size = Pt(10)
+            paragraph.font.size = _pt(10)
             paragraph.font.color.rgb = RGBColor(108, 117, 125)
-        
+
         text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
     
     def _add_image_placeholder(self, slide, position='right', custom_pos=None):
@@ -1092,20 +1655,26 @@ class PPTBuilder:
             left, top, width, height = custom_pos
         else:
             if position == 'right':
-                left, top, width, height = Inches(5.6), Inches(1.6), Inches(3.9), Inches(4.8)
+                left, top, width, height = (
+                    _inches(5.6), _inches(1.6), _inches(3.9), _inches(4.8)
+                )
             elif position == 'center':
-                left, top, width, height = Inches(2.8), Inches(4.2), Inches(4.4), Inches(2.8)
+                left, top, width, height = (
+                    _inches(2.8), _inches(4.2), _inches(4.4), _inches(2.8)
+                )
             else:  # left
-                left, top, width, height = Inches(0.2), Inches(1.6), Inches(3.9), Inches(4.8)
+                left, top, width, height = (
+                    _inches(0.2), _inches(1.6), _inches(3.9), _inches(4.8)
+                )
         
         # Validate placeholder dimensions
-        slide_width = Inches(10)
-        slide_height = Inches(7.5)
+        slide_width = _inches(10)
+        slide_height = _inches(7.5)
         
         if left + width > slide_width:
-            width = slide_width - left - Inches(0.1)
+            width = slide_width - left - _inches(0.1)
         if top + height > slide_height:
-            height = slide_height - top - Inches(0.1)
+            height = slide_height - top - _inches(0.1)
         
         # Create enhanced placeholder
         shape = slide.shapes.add_shape(
@@ -1114,30 +1683,35 @@ class PPTBuilder:
         shape.fill.solid()
         shape.fill.fore_color.rgb = RGBColor(248, 249, 250)  # Light gray
         shape.line.color.rgb = RGBColor(206, 212, 218)  # Darker border
-        shape.line.width = Pt(1.5)
-        
+        shape.line.width = _pt(1.5)
+
         # Add enhanced placeholder text with icon-like appearance
         text_frame = shape.text_frame
         text_frame.text = "🖼️\nImage Placeholder"
-        text_frame.margin_left = Pt(12)
-        text_frame.margin_right = Pt(12)
-        text_frame.margin_top = Pt(12)
-        text_frame.margin_bottom = Pt(12)
-        
+        text_frame.margin_left = _pt(12)
+        text_frame.margin_right = _pt(12)
+        text_frame.margin_top = _pt(12)
+        text_frame.margin_bottom = _pt(12)
+
         # Format text
         for paragraph in text_frame.paragraphs:
             paragraph.alignment = PP_ALIGN.CENTER
-            paragraph.font.size = Pt(14) if width > Inches(3) else Pt(12)
+            paragraph.font.size = _pt(14) if width > _inches(3) else _pt(12)
             paragraph.font.color.rgb = RGBColor(108, 117, 125)  # Medium gray
-        
+
         text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
         text_frame.text = "Image Placeholder"
         paragraph = text_frame.paragraphs[0]
         paragraph.alignment = PP_ALIGN.CENTER
-        paragraph.font.size = Pt(14)
+        paragraph.font.size = _pt(14)
         paragraph.font.color.rgb = RGBColor(100, 100, 100)
         text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
     
+    def _diagram_data_sufficient(self, kind, data) -> bool:
+        """Check whether a diagram of this kind has enough data to be drawn at all"""
+        min_items = DIAGRAM_MIN_ITEMS.get(kind)
+        return min_items is not None and bool(data) and len(data) >= min_items
+
     def _add_diagram_to_slide(self, slide, slide_data: Slide):
         """Add diagram to slide"""
         diagram_type = slide_data.diagram_type
@@ -1160,23 +1734,23 @@ class PPTBuilder:
         
         # Adaptive sizing based on number of steps and content density
         if max_steps_per_row <= 2:
-            step_width = Inches(2.2)
-            step_height = Inches(0.9)
-            arrow_width = Inches(0.6)
+            step_width = _inches(2.2)
+            step_height = _inches(0.9)
+            arrow_width = _inches(0.6)
         elif max_steps_per_row == 3:
-            step_width = Inches(2.0)
-            step_height = Inches(0.8)
-            arrow_width = Inches(0.5)
+            step_width = _inches(2.0)
+            step_height = _inches(0.8)
+            arrow_width = _inches(0.5)
         else:  # 4 steps
-            step_width = Inches(1.7)
-            step_height = Inches(0.7)
-            arrow_width = Inches(0.4)
+            step_width = _inches(1.7)
+            step_height = _inches(0.7)
+            arrow_width = _inches(0.4)
         
         # Calculate total width with improved spacing
         total_width = max_steps_per_row * step_width + (max_steps_per_row - 1) * arrow_width
         
         # Ensure diagram fits within slide boundaries
-        slide_content_width = Inches(9.2)  # Leave margins
+        slide_content_width = _inches(9.2)  # Leave margins
         if total_width > slide_content_width:
             # Proportionally reduce dimensions
             scale_factor = slide_content_width / total_width
@@ -1185,79 +1759,70 @@ class PPTBuilder:
             total_width = slide_content_width
         
         # Center the diagram horizontally with proper margins
-        start_left = (Inches(10) - total_width) / 2
-        top = Inches(4.3)  # Position with adequate spacing below text
-        
-        for i, step in enumerate(steps[:max_steps_per_row]):
+        start_left = (_inches(10) - total_width) / 2
+        top = _inches(4.3)  # Position with adequate spacing below text
+        
+        # Serialize every step box and arrow, then parse and attach them in one pass
+        shape_id = slide.shapes._next_shape_id
+        font_size = 1100 if step_width >= _inches(1.8) else 1000
+        arrow_height = _inches(0.3)
+        shapes_xml = []
+        step_texts = []
+        # Intelligent text truncation based on step box size
+        max_chars = int(step_width.inches * 12)  # Approximate chars per inch
+        labels = [
+            _truncate(text, max_chars)
+            for text in _item_labels(steps[:max_steps_per_row], 'step')
+        ]
+        for i, step_text in enumerate(labels):
             # Calculate position
             left = start_left + i * (step_width + arrow_width)
             
-            # Create step box with enhanced styling
-            shape = slide.shapes.add_shape(
-                MSO_SHAPE.RECTANGLE, left, top, step_width, step_height
-            )
-            shape.fill.solid()
-            shape.fill.fore_color.rgb = self.colors['secondary']
-            shape.line.color.rgb = self.colors['primary']
-            shape.line.width = Pt(2)
-            
-            # Add rounded corners effect with shadow-like border
-            shape.shadow.inherit = False
-            shape.shadow.style = 1  # Outer shadow
-            shape.shadow.blur_radius = Pt(3)
-            shape.shadow.distance = Pt(2)
-            shape.shadow.color.rgb = RGBColor(0, 0, 0)
-            shape.shadow.transparency = 0.3
-            
-            # Enhanced text formatting
-            text_frame = shape.text_frame
-            text_frame.margin_left = Pt(8)
-            text_frame.margin_right = Pt(8)
-            text_frame.margin_top = Pt(6)
-            text_frame.margin_bottom = Pt(6)
-            text_frame.word_wrap = True
-            
-            # Adaptive text handling
-            step_text = step.get('step', str(step)) if isinstance(step, dict) else str(step)
-            
-            # Intelligent text truncation based on step box size
-            max_chars = int(step_width.inches * 12)  # Approximate chars per inch
-            if len(step_text) > max_chars:
-                step_text = step_text[:max_chars-3] + "..."
-            
-            text_frame.text = step_text
-            paragraph = text_frame.paragraphs[0]
-            paragraph.alignment = PP_ALIGN.CENTER
-            paragraph.font.size = Pt(11) if step_width >= Inches(1.8) else Pt(10)
-            paragraph.font.color.rgb = RGBColor(255, 255, 255)
-            paragraph.font.bold = True
-            paragraph.line_spacing = 1.1
-            text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
+            # Step box with fill, border and outer shadow
+            shapes_xml.append(_PROCESS_STEP_XML.format(
+                id=shape_id, name_idx=shape_id - 1,
+                x=int(left), y=int(top), cx=int(step_width), cy=int(step_height),
+                fill=self._hex['secondary'], line=self._hex['primary'],
+                shadow=SHADOW_HEX, size=font_size,
+            ))
+            shape_id += 1
+            step_texts.append(step_text)
             
             # Add enhanced arrow between steps
             if i < min(len(steps), max_steps_per_row) - 1:
                 arrow_left = left + step_width
-                arrow_top = top + (step_height - Inches(0.3)) / 2  # Center vertically
-                
-                arrow_shape = slide.shapes.add_shape(
-                    MSO_SHAPE.RIGHT_ARROW, arrow_left, arrow_top, 
-                    arrow_width, Inches(0.3)
-                )
-                arrow_shape.fill.solid()
-                arrow_shape.fill.fore_color.rgb = self.colors['accent']
-                arrow_shape.line.color.rgb = self.colors['primary']
-                arrow_shape.line.width = Pt(1)
+                arrow_top = top + (step_height - arrow_height) / 2  # Center vertically
+                shapes_xml.append(_PROCESS_ARROW_XML.format(
+                    id=shape_id, name_idx=shape_id - 1,
+                    x=int(arrow_left), y=int(arrow_top),
+                    cx=int(arrow_width), cy=int(arrow_height),
+                    fill=self._hex['accent'], line=self._hex['primary'],
+                ))
+                shape_id += 1
+                step_texts.append(None)
+
+        spTree = slide.shapes._spTree
+        fragment = parse_xml(
+            f'<p:spTree {nsdecls("p", "a")}>{"".join(shapes_xml)}</p:spTree>'
+        )
+        for sp, step_text in zip(list(fragment), step_texts):
+            if step_text:
+                # append_text handles escaping and line breaks like text_frame.text
+                sp.txBody.p_lst[0].append_text(step_text)
+            spTree.insert_element_before(sp, 'p:extLst')
         
         # Add continuation indicator if there are more steps
         if len(steps) > max_steps_per_row:
             remaining_steps = len(steps) - max_steps_per_row
-            indicator_left = start_left + max_steps_per_row * (step_width + arrow_width) - arrow_width
+            row_width = max_steps_per_row * (step_width + arrow_width)
+            indicator_left = start_left + row_width - arrow_width
             indicator_shape = slide.shapes.add_textbox(
-                indicator_left, top + step_height + Inches(0.1), Inches(1), Inches(0.3)
+                indicator_left, top + step_height + _inches(0.1),
+                _inches(1), _inches(0.3)
             )
             indicator_frame = indicator_shape.text_frame
             indicator_frame.text = f"... +{remaining_steps} more"
-            indicator_frame.paragraphs[0].font.size = Pt(10)
+            indicator_frame.paragraphs[0].font.size = _pt(10)
             indicator_frame.paragraphs[0].font.italic = True
             indicator_frame.paragraphs[0].font.color.rgb = self.colors['light_text']
             indicator_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
@@ -1268,9 +1833,9 @@ class PPTBuilder:
         diagram_data = slide_data.diagram_data or []
         
         # Calculate diagram position with offset support
-        base_top = Inches(4.2)
+        base_top = _inches(4.2)
         if offset_top:
-            diagram_top = Inches(1.4) + offset_top
+            diagram_top = _inches(1.4) + offset_top
         else:
             diagram_top = base_top
         
@@ -1285,16 +1850,23 @@ class PPTBuilder:
             return
         
         max_steps = min(len(steps), 3)  # Max 3 steps for compact version
-        step_width = Inches(1.3)
-        step_height = Inches(0.6)
-        arrow_width = Inches(0.25)
+        step_width = _inches(1.3)
+        step_height = _inches(0.6)
+        arrow_width = _inches(0.25)
         
         # Calculate total width and center positioning
         total_width = max_steps * step_width + (max_steps - 1) * arrow_width
-        start_left = (Inches(10) - total_width) / 2
-        diagram_top = top if top else Inches(4.2)
-        
-        for i, step in enumerate(steps[:max_steps]):
+        start_left = (_inches(10) - total_width) / 2
+        diagram_top = top if top else _inches(4.2)
+        
+        primary = self.colors['primary']
+        secondary = self.colors['secondary']
+        accent = self.colors['accent']
+        labels = [
+            text if len(text) <= 12 else text[:10] + ".."
+            for text in _item_labels(steps[:max_steps], 'step')
+        ]
+        for i, step_text in enumerate(labels):
             left = start_left + i * (step_width + arrow_width)
             
             # Create step box with enhanced compact styling
@@ -1302,115 +1874,64 @@ class PPTBuilder:
                 MSO_SHAPE.RECTANGLE, left, diagram_top, step_width, step_height
             )
             shape.fill.solid()
-            shape.fill.fore_color.rgb = self.colors['secondary']
-            shape.line.color.rgb = self.colors['primary']
-            shape.line.width = Pt(1.5)
+            shape.fill.fore_color.rgb = secondary
+            shape.line.color.rgb = primary
+            shape.line.width = _pt(1.5)
             
-            # Enhanced text formatting for compact diagrams
-            text_frame = shape.text_frame
-            text_frame.margin_left = Pt(4)
-            text_frame.margin_right = Pt(4)
-            text_frame.margin_top = Pt(3)
-            text_frame.margin_bottom = Pt(3)
-            text_frame.word_wrap = True
-            
-            step_text = step.get('step', str(step)) if isinstance(step, dict) else str(step)
-            if len(step_text) > 12:
-                step_text = step_text[:10] + ".."
-            
-            text_frame.text = step_text
-            paragraph = text_frame.paragraphs[0]
-            paragraph.alignment = PP_ALIGN.CENTER
-            paragraph.font.size = Pt(9)
-            paragraph.font.color.rgb = RGBColor(255, 255, 255)
-            paragraph.font.bold = True
-            text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
+            # Enhanced text formatting for compact diagrams: swap in the preformatted
+            # text body
+            sp = shape._element
+            txBody = parse_xml(_COMPACT_STEP_TXBODY_XML)
+            txBody.p_lst[0].append_text(step_text)
+            sp.replace(sp.txBody, txBody)
             
             # Add arrow between steps
             if i < max_steps - 1:
                 arrow_left = left + step_width
-                arrow_top = diagram_top + (step_height - Inches(0.2)) / 2
+                arrow_top = diagram_top + (step_height - _inches(0.2)) / 2
                 arrow_shape = slide.shapes.add_shape(
                     MSO_SHAPE.RIGHT_ARROW, arrow_left, arrow_top, 
-                    arrow_width, Inches(0.2)
-                )
-                arrow_shape.fill.solid()
-                arrow_shape.fill.fore_color.rgb = self.colors['accent']
-                arrow_shape.line.color.rgb = self.colors['accent']
-        
-        for i, step in enumerate(steps[:max_steps]):
-            left = start_left + i * (step_width + arrow_width)
-            
-            # Add step box
-            shape = slide.shapes.add_shape(
-                MSO_SHAPE.RECTANGLE, left, top, step_width, step_height
-            )
-            shape.fill.solid()
-            shape.fill.fore_color.rgb = self.colors['secondary']
-            shape.line.color.rgb = self.colors['primary']
-            
-            # Add step text
-            text_frame = shape.text_frame
-            step_text = step.get('step', str(step)) if isinstance(step, dict) else str(step)
-            if len(step_text) > 10:
-                step_text = step_text[:8] + ".."
-            
-            text_frame.text = step_text
-            paragraph = text_frame.paragraphs[0]
-            paragraph.alignment = PP_ALIGN.CENTER
-            paragraph.font.size = Pt(8)
-            paragraph.font.color.rgb = RGBColor(255, 255, 255)
-            paragraph.font.bold = True
-            text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
-            
-            # Add arrow
-            if i < max_steps - 1:
-                arrow_left = left + step_width
-                arrow_shape = slide.shapes.add_shape(
-                    MSO_SHAPE.RIGHT_ARROW, arrow_left, top + Inches(0.15), 
-                    arrow_width, Inches(0.2)
+                    arrow_width, _inches(0.2)
                 )
                 arrow_shape.fill.solid()
-                arrow_shape.fill.fore_color.rgb = self.colors['accent']
+                arrow_shape.fill.fore_color.rgb = accent
+                arrow_shape.line.color.rgb = accent
     
     def _create_comparison_diagram(self, slide, comparison_data):
         """Create enhanced comparison diagram with adaptive sizing and styling"""
-        if len(comparison_data) < 2:
+        if not self._diagram_data_sufficient('comparison', comparison_data):
             return
         
         # Enhanced box dimensions with better proportions
-        box_width = Inches(3.8)
-        box_height = Inches(2.8)
-        gap = Inches(0.6)
+        box_width = _inches(3.8)
+        box_height = _inches(2.8)
+        gap = _inches(0.6)
         
         # Center the comparison boxes with proper margins
         total_width = 2 * box_width + gap
-        start_left = (Inches(10) - total_width) / 2
-        top = Inches(4.2)  # Positioned to avoid text overlap
+        start_left = (_inches(10) - total_width) / 2
+        top = _inches(4.2)  # Positioned to avoid text overlap
         
         # Left column with enhanced styling
         left_box = slide.shapes.add_shape(
             MSO_SHAPE.RECTANGLE, start_left, top, box_width, box_height
         )
         left_box.fill.solid()
-        left_box.fill.fore_color.rgb = RGBColor(230, 242, 255)  # Light blue
+        left_box.fill.fore_color.rgb = LIGHT_BLUE_FILL  # Light blue
         left_box.line.color.rgb = self.colors['secondary']
-        left_box.line.width = Pt(2.5)
+        left_box.line.width = _pt(2.5)
         
         # Add subtle shadow effect
-        left_box.shadow.inherit = False
-        left_box.shadow.style = 1
-        left_box.shadow.blur_radius = Pt(4)
-        left_box.shadow.distance = Pt(3)
-        left_box.shadow.color.rgb = RGBColor(0, 0, 0)
-        left_box.shadow.transparency = 0.25
+        self._apply_outer_shadow(
+            left_box, blur_radius=_pt(4), distance=_pt(3), transparency=0.25
+        )
         
         # Enhanced text formatting for left box
         left_text = left_box.text_frame
-        left_text.margin_left = Pt(15)
-        left_text.margin_right = Pt(15)
-        left_text.margin_top = Pt(15)
-        left_text.margin_bottom = Pt(15)
+        left_text.margin_left = _pt(15)
+        left_text.margin_right = _pt(15)
+        left_text.margin_top = _pt(15)
+        left_text.margin_bottom = _pt(15)
         left_text.word_wrap = True
         
         # Adaptive text handling
@@ -1426,24 +1947,21 @@ class PPTBuilder:
             MSO_SHAPE.RECTANGLE, start_left + box_width + gap, top, box_width, box_height
         )
         right_box.fill.solid()
-        right_box.fill.fore_color.rgb = RGBColor(255, 242, 230)  # Light orange
+        right_box.fill.fore_color.rgb = LIGHT_ORANGE_FILL  # Light orange
         right_box.line.color.rgb = self.colors['accent']
-        right_box.line.width = Pt(2.5)
+        right_box.line.width = _pt(2.5)
         
         # Add shadow effect to right box
-        right_box.shadow.inherit = False
-        right_box.shadow.style = 1
-        right_box.shadow.blur_radius = Pt(4)
-        right_box.shadow.distance = Pt(3)
-        right_box.shadow.color.rgb = RGBColor(0, 0, 0)
-        right_box.shadow.transparency = 0.25
+        self._apply_outer_shadow(
+            right_box, blur_radius=_pt(4), distance=_pt(3), transparency=0.25
+        )
         
         # Enhanced text formatting for right box
         right_text = right_box.text_frame
-        right_text.margin_left = Pt(15)
-        right_text.margin_right = Pt(15)
-        right_text.margin_top = Pt(15)
-        right_text.margin_bottom = Pt(15)
+        right_text.margin_left = _pt(15)
+        right_text.margin_right = _pt(15)
+        right_text.margin_top = _pt(15)
+        right_text.margin_bottom = _pt(15)
         right_text.word_wrap = True
         
         right_title = comparison_data[1].get('title', 'Option B') if isinstance(comparison_data[1], dict) else str(comparison_data[1])
@@ -1454,47 +1972,47 @@ class PPTBuilder:
         self._format_comparison_text(right_text)
         
         # Add connecting element (vs. indicator)
-        vs_left = start_left + box_width + (gap / 2) - Inches(0.25)
-        vs_top = top + (box_height / 2) - Inches(0.15)
-        vs_shape = slide.shapes.add_textbox(vs_left, vs_top, Inches(0.5), Inches(0.3))
+        vs_left = start_left + box_width + (gap / 2) - _inches(0.25)
+        vs_top = top + (box_height / 2) - _inches(0.15)
+        vs_shape = slide.shapes.add_textbox(vs_left, vs_top, _inches(0.5), _inches(0.3))
         vs_frame = vs_shape.text_frame
         vs_frame.text = "VS"
         vs_paragraph = vs_frame.paragraphs[0]
         vs_paragraph.alignment = PP_ALIGN.CENTER
-        vs_paragraph.font.size = Pt(12)
+        vs_paragraph.font.size = _pt(12)
         vs_paragraph.font.bold = True
         vs_paragraph.font.color.rgb = self.colors['primary']
         vs_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
     
     def _create_compact_comparison_diagram(self, slide, comparison_data, top=None):
         """Create compact comparison diagram for mixed layouts with positioning control"""
-        if len(comparison_data) < 2:
+        if not self._diagram_data_sufficient('comparison', comparison_data):
             return
         
         # Enhanced compact dimensions
-        box_width = Inches(2.8)
-        box_height = Inches(1.6)
-        gap = Inches(0.4)
+        box_width = _inches(2.8)
+        box_height = _inches(1.6)
+        gap = _inches(0.4)
         
         # Center the boxes horizontally
         total_width = 2 * box_width + gap
-        start_left = (Inches(10) - total_width) / 2
-        diagram_top = top if top else Inches(4.5)
+        start_left = (_inches(10) - total_width) / 2
+        diagram_top = top if top else _inches(4.5)
         
         # Left column with enhanced styling
         left_box = slide.shapes.add_shape(
             MSO_SHAPE.RECTANGLE, start_left, diagram_top, box_width, box_height
         )
         left_box.fill.solid()
-        left_box.fill.fore_color.rgb = RGBColor(230, 242, 255)
+        left_box.fill.fore_color.rgb = LIGHT_BLUE_FILL
         left_box.line.color.rgb = self.colors['secondary']
-        left_box.line.width = Pt(1.5)
+        left_box.line.width = _pt(1.5)
         
         left_text = left_box.text_frame
-        left_text.margin_left = Pt(8)
-        left_text.margin_right = Pt(8)
-        left_text.margin_top = Pt(6)
-        left_text.margin_bottom = Pt(6)
+        left_text.margin_left = _pt(8)
+        left_text.margin_right = _pt(8)
+        left_text.margin_top = _pt(6)
+        left_text.margin_bottom = _pt(6)
         left_text.word_wrap = True
         
         left_title = comparison_data[0].get('title', 'Option A') if isinstance(comparison_data[0], dict) else str(comparison_data[0])
@@ -1504,7 +2022,7 @@ class PPTBuilder:
         
         paragraph = left_text.paragraphs[0]
         paragraph.alignment = PP_ALIGN.CENTER
-        paragraph.font.size = Pt(11)
+        paragraph.font.size = _pt(11)
         paragraph.font.bold = True
         paragraph.font.color.rgb = self.colors['primary']
         paragraph.line_spacing = 1.1
@@ -1515,15 +2033,15 @@ class PPTBuilder:
             MSO_SHAPE.RECTANGLE, start_left + box_width + gap, diagram_top, box_width, box_height
         )
         right_box.fill.solid()
-        right_box.fill.fore_color.rgb = RGBColor(255, 242, 230)
+        right_box.fill.fore_color.rgb = LIGHT_ORANGE_FILL
         right_box.line.color.rgb = self.colors['accent']
-        right_box.line.width = Pt(1.5)
+        right_box.line.width = _pt(1.5)
         
         right_text = right_box.text_frame
-        right_text.margin_left = Pt(8)
-        right_text.margin_right = Pt(8)
-        right_text.margin_top = Pt(6)
-        right_text.margin_bottom = Pt(6)
+        right_text.margin_left = _pt(8)
+        right_text.margin_right = _pt(8)
+        right_text.margin_top = _pt(6)
+        right_text.margin_bottom = _pt(6)
         right_text.word_wrap = True
         
         right_title = comparison_data[1].get('title', 'Option B') if isinstance(comparison_data[1], dict) else str(comparison_data[1])
@@ -1533,13 +2051,13 @@ class PPTBuilder:
         
         paragraph = right_text.paragraphs[0]
         paragraph.alignment = PP_ALIGN.CENTER
-        paragraph.font.size = Pt(11)
+        paragraph.font.size = _pt(11)
         paragraph.font.bold = True
         paragraph.font.color.rgb = self.colors['primary']
         paragraph.line_spacing = 1.1
         right_text.vertical_anchor = MSO_ANCHOR.MIDDLE
         right_box.fill.solid()
-        right_box.fill.fore_color.rgb = RGBColor(250, 240, 230)
+        right_box.fill.fore_color.rgb = WARM_FILL
         right_box.line.color.rgb = self.colors['accent']
         
         right_text = right_box.text_frame
@@ -1550,7 +2068,7 @@ class PPTBuilder:
         
         paragraph = right_text.paragraphs[0]
         paragraph.alignment = PP_ALIGN.CENTER
-        paragraph.font.size = Pt(12)
+        paragraph.font.size = _pt(12)
         paragraph.font.bold = True
         paragraph.font.color.rgb = self.colors['primary']
         right_text.vertical_anchor = MSO_ANCHOR.MIDDLE
@@ -1561,18 +2079,13 @@ class PPTBuilder:
             return
         
         # Top level box
-        top_item = hierarchy_data[0] if hierarchy_data else {}
-        top_text = top_item.get('title', 'Root') if isinstance(top_item, dict) else str(top_item)
-        
-        # Ensure text fits in box
-        if len(top_text) > 20:
-            top_text = top_text[:17] + "..."
+        top_text = _truncate(_item_labels(hierarchy_data[:1], 'title', 'Root')[0], 20)
         
         # Center the top box
-        box_width = Inches(3)
-        box_height = Inches(0.8)
-        top_left = (Inches(10) - box_width) / 2
-        top_top = Inches(4)
+        box_width = _inches(3)
+        box_height = _inches(0.8)
+        top_left = (_inches(10) - box_width) / 2
+        top_top = _inches(4)
         
         top_box = slide.shapes.add_shape(
             MSO_SHAPE.RECTANGLE, top_left, top_top, box_width, box_height
@@ -1580,88 +2093,113 @@ class PPTBuilder:
         top_box.fill.solid()
         top_box.fill.fore_color.rgb = self.colors['primary']
         top_box.line.color.rgb = self.colors['primary']
-        top_box.line.width = Pt(2)
+        top_box.line.width = _pt(2)
         
         text_frame = top_box.text_frame
-        text_frame.margin_left = Pt(8)
-        text_frame.margin_right = Pt(8)
-        text_frame.margin_top = Pt(8)
-        text_frame.margin_bottom = Pt(8)
+        text_frame.margin_left = _pt(8)
+        text_frame.margin_right = _pt(8)
+        text_frame.margin_top = _pt(8)
+        text_frame.margin_bottom = _pt(8)
         
         text_frame.text = top_text
         paragraph = text_frame.paragraphs[0]
         paragraph.alignment = PP_ALIGN.CENTER
-        paragraph.font.size = Pt(14)
-        paragraph.font.color.rgb = RGBColor(255, 255, 255)
+        paragraph.font.size = _pt(14)
+        paragraph.font.color.rgb = WHITE
         paragraph.font.bold = True
         text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
         
         # Add sub-items if available
         if len(hierarchy_data) > 1:
             sub_items = hierarchy_data[1:4]  # Max 3 sub-items
-            sub_box_width = Inches(2.2)
-            sub_box_height = Inches(0.6)
-            sub_gap = Inches(0.4)
-            
-            total_sub_width = len(sub_items) * sub_box_width + (len(sub_items) - 1) * sub_gap
-            sub_start_left = (Inches(10) - total_sub_width) / 2
-            sub_top = top_top + box_height + Inches(0.5)
-            
-            for i, sub_item in enumerate(sub_items):
-                sub_text = sub_item.get('title', f'Item {i+1}') if isinstance(sub_item, dict) else str(sub_item)
-                if len(sub_text) > 15:
-                    sub_text = sub_text[:12] + "..."
-                
-                sub_left = sub_start_left + i * (sub_box_width + sub_gap)
-                
+            sub_box_width = _inches(2.2)
+            sub_box_height = _inches(0.6)
+            sub_gap = _inches(0.4)
+            sub_top = top_top + box_height + _inches(0.5)
+
+            # All geometry is loop-invariant apart from the x offset, so resolve it
+            # up front
+            sub_lefts = _compute_hierarchy_geometry(
+                len(sub_items), sub_box_width, sub_gap
+            )
+            line_start_x = top_left + box_width / 2
+            line_start_y = top_top + box_height
+
+            primary, secondary = self.colors['primary'], self.colors['secondary']
+            sub_labels = [
+                _truncate(text, 15)
+                for text in _item_labels(sub_items, 'title', 'Item {}')
+            ]
+            for sub_text, sub_left in zip(sub_labels, sub_lefts):
                 sub_box = slide.shapes.add_shape(
                     MSO_SHAPE.RECTANGLE, sub_left, sub_top, sub_box_width, sub_box_height
                 )
                 sub_box.fill.solid()
-                sub_box.fill.fore_color.rgb = self.colors['secondary']
-                sub_box.line.color.rgb = self.colors['primary']
+                sub_box.fill.fore_color.rgb = secondary
+                sub_box.line.color.rgb = primary
                 
                 sub_text_frame = sub_box.text_frame
                 sub_text_frame.text = sub_text
                 sub_paragraph = sub_text_frame.paragraphs[0]
                 sub_paragraph.alignment = PP_ALIGN.CENTER
-                sub_paragraph.font.size = Pt(11)
-                sub_paragraph.font.color.rgb = RGBColor(255, 255, 255)
+                sub_paragraph.font.size = _pt(11)
+                sub_paragraph.font.color.rgb = WHITE
                 sub_paragraph.font.bold = True
                 sub_text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
-                
-                # Add connecting line
-                line_start_x = top_left + box_width / 2
-                line_start_y = top_top + box_height
-                line_end_x = sub_left + sub_box_width / 2
-                line_end_y = sub_top
-                
-                connector = slide.shapes.add_connector(
-                    1, line_start_x, line_start_y, line_end_x, line_end_y
-                )
-                connector.line.color.rgb = self.colors['primary']
-                connector.line.width = Pt(2)
+
+            # Connecting lines are serialized together and inserted in one pass after
+            # the boxes
+            shape_id = slide.shapes._next_shape_id
+            connectors_xml = "".join(
+                _connector_xml(shape_id + i, line_start_x, line_start_y,
+                               sub_left + sub_box_width / 2, sub_top,
+                               _pt(2), self._hex['primary'])
+                for i, sub_left in enumerate(sub_lefts)
+            )
+            spTree = slide.shapes._spTree
+            fragment = parse_xml(
+                f'<p:spTree {nsdecls("p", "a")}>{connectors_xml}</p:spTree>'
+            )
+            for connector in list(fragment):
+                spTree.insert_element_before(connector, 'p:extLst')
     
+    def _apply_outer_shadow(self, shape, blur_radius, distance, transparency,
+                            color_hex=SHADOW_HEX):
+        """Write an outer shadow straight into the shape's effect list"""
+        effect_lst = shape._element.spPr.get_or_add_effectLst()
+        for child in list(effect_lst):
+            effect_lst.remove(child)
+        alpha = int(round((1 - transparency) * 100000))
+        effect_lst.append(parse_xml(
+            f'<a:outerShdw {nsdecls("a")} blurRad="{int(blur_radius)}"'
+            f' dist="{int(distance)}" '
+            f'dir="2700000" algn="tl" rotWithShape="0">'
+            f'<a:srgbClr val="{color_hex}"><a:alpha val="{alpha}"/></a:srgbClr>'
+            f'</a:outerShdw>'
+        ))
+
     def _format_comparison_text(self, text_frame):
         """Format comparison diagram text with enhanced styling"""
         paragraph = text_frame.paragraphs[0]
         paragraph.alignment = PP_ALIGN.CENTER
-        paragraph.font.size = Pt(15)
+        paragraph.font.size = _pt(15)
         paragraph.font.bold = True
         paragraph.font.color.rgb = self.colors['primary']
         paragraph.line_spacing = 1.2
-        paragraph.space_before = Pt(3)
-        paragraph.space_after = Pt(3)
+        paragraph.space_before = _pt(3)
+        paragraph.space_after = _pt(3)
         
         # Enhanced text frame properties
         text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
         text_frame.word_wrap = True
-        text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+        text_frame.auto_size = _AUTO_FIT
     
     def _add_legacy_diagram(self, slide, diagram_description):
         """Add legacy diagram support"""
         try:
             diagram_img = generate_diagram_image(diagram_description)
-            slide.shapes.add_picture(diagram_img, Inches(2), Inches(2), width=Inches(4))
+            slide.shapes.add_picture(
+                diagram_img, _inches(2), _inches(2), width=_inches(4)
+            )
         except Exception as e:
             logger.error(f"Failed to embed legacy diagram: {diagram_description} - {e}")
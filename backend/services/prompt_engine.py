@@ -1,18 +1,230 @@
 from core.config import settings
 from core.logger import get_logger
-from services.slide_schema import Deck, Slide
+from services.slide_schema import DECK_ADAPTER, Deck
 from services.image_service import image_service
+from services.streaming_service import streaming_service
 from pydantic import ValidationError
+import asyncio
+import hashlib
 import json
+import os
+import random
+import re
+import threading
 import time
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-from langchain.output_parsers import PydanticOutputParser
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from string import Template
 
 logger = get_logger("prompt_engine")
 
+RETRY_BACKOFF_BASE = 0.5  # seconds
+RETRY_BACKOFF_CAP = 8.0
+IMAGE_LOOKUP_WORKERS = 8
+# Titles that get a default process diagram; substring match, so "Processing" and
+# "Methods" count too
+_PROCESS_TITLE_RE = re.compile(r'process|steps|workflow|method', re.IGNORECASE)
+
+# Validated LLM decks (before post-processing) keyed by a hash of the request
+DECK_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "prompt_engine")
+
+# Hot in-process tier in front of the disk cache: key -> (stored_at, Deck)
+MEMORY_DECK_CACHE_SIZE = 64
+_memory_decks = OrderedDict()
+_memory_decks_lock = threading.Lock()
+
+
+def _remember_deck(key: str, deck: Deck, stored_at: float = None):
+    with _memory_decks_lock:
+        _memory_decks[key] = (stored_at or time.time(), deck.model_copy(deep=True))
+        _memory_decks.move_to_end(key)
+        while len(_memory_decks) > MEMORY_DECK_CACHE_SIZE:
+            _memory_decks.popitem(last=False)
+
+
+def _read_cached_deck(key: str):
+    """Return the cached Deck for key, or None when missing, expired or unreadable"""
+    with _memory_decks_lock:
+        entry = _memory_decks.get(key)
+        if entry is not None:
+            if time.time() - entry[0] <= settings.deck_cache_ttl:
+                _memory_decks.move_to_end(key)
+                # Post-processing mutates the deck, so hand out a copy
+                return entry[1].model_copy(deep=True)
+            del _memory_decks[key]
+    path = os.path.join(DECK_CACHE_DIR, f"{key}.json")
+    try:
+        stored_at = os.path.getmtime(path)
+        if time.time() - stored_at > settings.deck_cache_ttl:
+            return None
+        with open(path, 'rb') as f:
+            deck = DECK_ADAPTER.validate_json(f.read())
+    except (OSError, ValidationError):
+        return None
+    _remember_deck(key, deck, stored_at)
+    return deck
+
+
+def _write_cached_deck(key: str, deck: Deck):
+    """Atomically store a validated Deck under key"""
+    _remember_deck(key, deck)
+    path = os.path.join(DECK_CACHE_DIR, f"{key}.json")
+    try:
+        os.makedirs(DECK_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(DECK_ADAPTER.dump_json(deck))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write deck cache entry: {e}")
+    _prune_deck_cache()
+
+
+def _prune_deck_cache():
+    """Delete expired disk entries, then the oldest beyond deck_cache_max_entries"""
+    now = time.time()
+    entries = []
+    try:
+        with os.scandir(DECK_CACHE_DIR) as it:
+            for entry in it:
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                if now - mtime > settings.deck_cache_ttl:
+                    _remove_quietly(entry.path)
+                else:
+                    entries.append((mtime, entry.path))
+    except OSError:
+        return
+    excess = len(entries) - settings.deck_cache_max_entries
+    if excess > 0:
+        entries.sort()
+        for _, path in entries[:excess]:
+            _remove_quietly(path)
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# Request-specific part of the prompt. The format instructions are the same for every
+# request, so they go first (see PromptEngine.__init__) and keep a byte-identical
+# prefix that Gemini's implicit prompt caching can reuse across decks.
+_PROMPT_TEMPLATE = Template("""
+Create a professional PowerPoint presentation about "$topic" with $num_slides slides.
+
+Structure the presentation as follows:
+
+Slide 1 (Title Slide):
+- type: "title"
+- title: Main presentation title
+- subtitle: Brief description or author info
+
+Slides 2-$last_content_slide (Content Slides):
+- type: "content"
+- title: Clear, descriptive heading (will be used for automatic image search)
+- bullets: Array of 3-5 bullet points (for backward compatibility)
+- content: Enhanced bullet points with sub-points where appropriate
+$image_hint
+$diagram_hint
+$diagram_data_hint
+
+Final Slide (Conclusion):
+- type: "conclusion"
+- title: "Conclusion" or "Key Takeaways"
+- bullets: Summary points
+
+Guidelines for content:
+1. Use clear, engaging headings (these help with automatic image matching)
+2. Keep bullet points concise but informative
+3. Include sub-points for complex topics
+4. Make slide titles descriptive for better image search results
+5. Add diagrams for processes, comparisons, or hierarchies
+6. Ensure professional tone throughout
+
+For bullet points, you can use simple strings or structured format:
+- Simple: ["Point 1", "Point 2", "Point 3"]
+- Enhanced: [
+    "Simple point",
+    {"text": "Complex point with details", "level": 0,
+     "sub_points": ["Detail 1", "Detail 2"]},
+    "Another simple point"
+]
+""")
+IMAGE_HINT = "- Note: Images will be automatically added based on slide titles"
+DIAGRAM_HINT = (
+    "- diagram_type: 'process', 'comparison', or 'hierarchy' where concepts need "
+    "visual explanation"
+)
+DIAGRAM_DATA_HINT = "- diagram_data: Relevant data for the diagram"
+
+
+def _render_prompt(prefix: str, topic: str, num_slides: int, include_images: bool,
+                   include_diagrams: bool) -> str:
+    """Render the slide generation prompt: shared prefix, then the request details"""
+    return prefix + _PROMPT_TEMPLATE.substitute(
+        topic=topic,
+        num_slides=num_slides,
+        last_content_slide=num_slides - 1,
+        image_hint=IMAGE_HINT if include_images else "",
+        diagram_hint=DIAGRAM_HINT if include_diagrams else "",
+        diagram_data_hint=DIAGRAM_DATA_HINT if include_diagrams else "",
+    )
+
+
+_SLIDES_ARRAY_RE = re.compile(r'"slides"\s*:\s*\[')
+_ITEM_SEPARATOR_RE = re.compile(r'[\s,]*')
+_JSON_DECODER = json.JSONDecoder()
+
+
+class _SlideStreamParser:
+    """Pulls each complete slide object out of a streamed {"slides": [...]} reply
+
+    Only the slide currently being generated is re-scanned on each feed, so the work
+    stays linear in the reply length rather than re-parsing the growing buffer.
+    """
+
+    def __init__(self):
+        self.text = ""
+        # Offset just past the last complete slide (or the opening bracket)
+        self._pos = None
+
+    def feed(self, chunk: str) -> list:
+        """Append a chunk and return the slide dicts completed by it"""
+        self.text += chunk
+        if self._pos is None:
+            match = _SLIDES_ARRAY_RE.search(self.text)
+            if not match:
+                return []
+            self._pos = match.end()
+        slides = []
+        while True:
+            start = _ITEM_SEPARATOR_RE.match(self.text, self._pos).end()
+            if not self.text.startswith('{', start):
+                break
+            try:
+                slide, self._pos = _JSON_DECODER.raw_decode(self.text, start)
+            except json.JSONDecodeError:
+                break  # Still being generated
+            if isinstance(slide, dict):
+                slides.append(slide)
+        return slides
+
+
 class PromptEngine:
     def __init__(self):
+        # LangChain's import graph is heavy; load it on first use rather than at startup
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        from langchain.prompts import PromptTemplate
+        from langchain.output_parsers import PydanticOutputParser
+
         self.api_key = settings.gemini_api_key
         self.model = settings.gemini_model
         self.temperature = 0.3
@@ -21,9 +233,15 @@ class PromptEngine:
             model=self.model,
             google_api_key=self.api_key,
             temperature=self.temperature,
+            # JSON mode: the model can only emit syntactically valid JSON, so no
+            # fences or prose to strip
+            response_mime_type="application/json",
         )
         self.parser = PydanticOutputParser(pydantic_object=Deck)
         self.format_instructions = self.parser.get_format_instructions()
+        self._prompt_prefix = (
+            f"\nYou are an expert slide deck generator.\n\n{self.format_instructions}\n"
+        )
         self.prompt_template = PromptTemplate(
             template=(
                 "You are an expert slide deck generator.\n"
@@ -34,115 +252,189 @@ class PromptEngine:
             partial_variables={"format_instructions": self.format_instructions},
         )
 
-    def generate_slides(self, topic: str, num_slides: int = 8, include_images: bool = True, include_diagrams: bool = True) -> Deck:
-        """Generate enhanced slide content with formatting instructions"""
-        print("DEBUG: generate_slides called", flush=True)
-        
-        # Enhanced prompt with formatting instructions
-        enhanced_prompt = f"""
-        You are an expert slide deck generator. Create a professional PowerPoint presentation about "{topic}" with {num_slides} slides.
-        
-        Structure the presentation as follows:
-        
-        Slide 1 (Title Slide):
-        - type: "title"
-        - title: Main presentation title
-        - subtitle: Brief description or author info
-        
-        Slides 2-{num_slides-1} (Content Slides):
-        - type: "content"
-        - title: Clear, descriptive heading (will be used for automatic image search)
-        - bullets: Array of 3-5 bullet points (for backward compatibility)
-        - content: Enhanced bullet points with sub-points where appropriate
-        {"- Note: Images will be automatically added based on slide titles" if include_images else ""}
-        {"- diagram_type: 'process', 'comparison', or 'hierarchy' where concepts need visual explanation" if include_diagrams else ""}
-        {"- diagram_data: Relevant data for the diagram" if include_diagrams else ""}
-        
-        Final Slide (Conclusion):
-        - type: "conclusion"
-        - title: "Conclusion" or "Key Takeaways"
-        - bullets: Summary points
-        
-        Guidelines for content:
-        1. Use clear, engaging headings (these help with automatic image matching)
-        2. Keep bullet points concise but informative
-        3. Include sub-points for complex topics
-        4. Make slide titles descriptive for better image search results
-        5. Add diagrams for processes, comparisons, or hierarchies
-        6. Ensure professional tone throughout
-        
-        For bullet points, you can use simple strings or structured format:
-        - Simple: ["Point 1", "Point 2", "Point 3"]
-        - Enhanced: [
-            "Simple point",
-            {{"text": "Complex point with details", "level": 0, "sub_points": ["Detail 1", "Detail 2"]}},
-            "Another simple point"
-        ]
-        
-        {self.format_instructions}
+    def generate_slides(self, topic: str, num_slides: int = 8,
+                        include_images: bool = True, include_diagrams: bool = True,
+                        job_id: str = None, regenerate: bool = False) -> Deck:
+        """Generate enhanced slide content with formatting instructions
+
+        With a job_id the reply is streamed: a slide_ready event is emitted as each
+        slide completes, and its image lookup starts while the model is still writing
+        the rest. regenerate skips any cached deck; the fresh one replaces it.
         """
-        
+        # Enhanced prompt: shared format instructions followed by the request details
+        enhanced_prompt = _render_prompt(
+            self._prompt_prefix, topic, num_slides, include_images, include_diagrams
+        )
+
+        cache_key = self._deck_cache_key(
+            topic, num_slides, include_images, include_diagrams
+        )
+        if cache_key and not regenerate:
+            cached_deck = _read_cached_deck(cache_key)
+            if cached_deck is not None:
+                logger.info(f"Using cached deck for topic: {topic}")
+                return self._post_process_deck(
+                    cached_deck, topic, include_images, include_diagrams
+                )
+
+        prompt = enhanced_prompt
         last_error = None
         for attempt in range(1, self.max_retries + 1):
             try:
                 logger.info(f"Calling Gemini for topic: {topic} (attempt {attempt})")
-                print("DEBUG: About to call LLM", flush=True)
+                early_images = {}
                 try:
-                    response = self.llm.invoke(enhanced_prompt)
-                    print("DEBUG: LLM call returned", flush=True)
-                    print("DEBUG: LLM response object:", response, flush=True)
-                    print("RAW LLM OUTPUT:", getattr(response, 'content', response), flush=True)
-                except Exception as e:
-                    print("EXCEPTION DURING LLM CALL:", e, flush=True)
+                    if job_id and attempt == 1:
+                        content = self._stream_reply(
+                            prompt, topic, job_id,
+                            early_images if include_images else None,
+                        )
+                    else:
+                        response = self.llm.invoke(prompt)
+                        content = getattr(response, 'content', response)
+                except Exception:
+                    logger.exception("Exception during LLM call")
                     raise
-                
-                # Use the structured output parser
-                deck = self.parser.parse(getattr(response, 'content', response))
-                
+                # Lazy %-formatting: the (large) raw output is only rendered when DEBUG
+                # is on
+                logger.debug("Raw LLM output: %s", content)
+
+                # Parse the JSON body directly; the output parser only supplies format
+                # instructions
+                deck = self._fast_parse(content)
+                if cache_key:
+                    _write_cached_deck(cache_key, deck)
+
                 # Post-process slides to ensure backward compatibility
-                deck = self._post_process_deck(deck, topic, include_images, include_diagrams)
-                
-                logger.info(f"Validated Deck: {deck}")
+                deck = self._post_process_deck(
+                    deck, topic, include_images, include_diagrams, early_images
+                )
+
+                logger.info(
+                    f"Validated deck with {len(deck.slides)} slides for topic: {topic}"
+                )
+                logger.debug("Validated Deck: %s", deck)
                 return deck
             except (ValidationError, json.JSONDecodeError, ValueError) as e:
-                logger.error(f"Validation/JSON error: {e}")
+                if isinstance(e, ValidationError):
+                    details = e.errors(include_url=False)
+                else:
+                    details = e
+                logger.error(f"Validation/JSON error: {details}")
                 last_error = e
+                # Bad output is not transient: retry right away and tell the model
+                # what was wrong
+                prompt = (
+                    f"{enhanced_prompt}\nPrevious output failed validation with: {e}. "
+                    "Return corrected JSON.\n"
+                )
+                continue
             except Exception as e:
                 logger.error(f"LLM call failed: {e}")
                 last_error = e
-            time.sleep(1)
-        raise ValueError(f"Failed to generate valid slides after {self.max_retries} attempts: {last_error}")
-    
-    def _post_process_deck(self, deck: Deck, topic: str, include_images: bool, include_diagrams: bool) -> Deck:
-        """Post-process the deck to add enhanced features with automatic image fetching"""
+            if attempt < self.max_retries:
+                # Exponential backoff with jitter for provider errors such as rate
+                # limiting
+                backoff = min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * (2 ** attempt))
+                time.sleep(backoff * random.uniform(0.5, 1.5))
+        raise ValueError(
+            f"Failed to generate valid slides after {self.max_retries} attempts: "
+            f"{last_error}"
+        )
+
+    def _stream_reply(self, prompt: str, topic: str, job_id: str,
+                      early_images: dict = None) -> str:
+        """Stream the reply, emitting slide_ready per completed slide; returns its text
+
+        When early_images is given, image lookups for content slides are started as
+        they complete and their futures stored in it by slide index.
+        """
+        parser = _SlideStreamParser()
+        executor = None
+        if early_images is not None:
+            executor = ThreadPoolExecutor(max_workers=IMAGE_LOOKUP_WORKERS)
+        slide_count = 0
+        try:
+            for chunk in self.llm.stream(prompt):
+                text = chunk.content
+                if not text:
+                    continue
+                for slide in parser.feed(text):
+                    title = str(slide.get('title', ''))
+                    streaming_service.emit_event(job_id, "slide_ready", {
+                        "message": f"Slide {slide_count + 1} ready: {title}",
+                        "slide_number": slide_count + 1,
+                        "title": title
+                    })
+                    is_content = slide.get('type', 'content') == 'content'
+                    has_image = slide.get('image_url') or slide.get('images')
+                    if executor and slide_count > 0 and is_content and not has_image:
+                        early_images[slide_count] = executor.submit(
+                            image_service.get_image_url, topic=topic, slide_title=title
+                        )
+                    slide_count += 1
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
+        return parser.text
+
+    async def agenerate_slides(self, topic: str, num_slides: int = 8,
+                               include_images: bool = True,
+                               include_diagrams: bool = True,
+                               regenerate: bool = False) -> Deck:
+        """Async variant of generate_slides, run in a worker thread"""
+        return await asyncio.to_thread(
+            self.generate_slides, topic, num_slides, include_images, include_diagrams,
+            regenerate=regenerate,
+        )
+
+    def _deck_cache_key(self, topic: str, num_slides: int, include_images: bool,
+                        include_diagrams: bool):
+        """Disk cache key for a request, or None when the deck cache is disabled"""
+        if not settings.deck_cache_enabled:
+            return None
+        # Case and whitespace variants of a topic ask for the same deck
+        topic = " ".join(topic.lower().split())
+        return hashlib.sha256(
+            f"{topic}|{num_slides}|{include_images}|{include_diagrams}|"
+            f"{self.model}|{self.temperature}".encode()
+        ).hexdigest()
+
+    def _fast_parse(self, content: str) -> Deck:
+        """Parse the JSON object in an LLM response (ignoring fences) into a Deck"""
+        json_text = content[content.index('{'):content.rindex('}') + 1]
+        # pydantic-core parses and validates in one pass, without an intermediate dict
+        return DECK_ADAPTER.validate_json(json_text)
+
+    def _post_process_deck(self, deck: Deck, topic: str, include_images: bool,
+                           include_diagrams: bool, early_images: dict = None) -> Deck:
+        """Post-process the deck to add enhanced features with automatic image fetching
+
+        early_images maps slide index to a Future for a lookup already started while
+        streaming.
+        """
         processed_slides = []
-        
-        logger.info(f"🔄 Post-processing {len(deck.slides)} slides with images: {include_images}, diagrams: {include_diagrams}")
-        
+
+        logger.info(
+            f"🔄 Post-processing {len(deck.slides)} slides with images: "
+            f"{include_images}, diagrams: {include_diagrams}"
+        )
+
         for i, slide in enumerate(deck.slides):
-            # Ensure backward compatibility by copying bullets to content if content is empty
+            # Ensure backward compatibility by copying bullets to content if content
+            # is empty
             if not slide.content and slide.bullets:
                 slide.content = slide.bullets.copy()
             elif not slide.bullets and slide.content:
                 # Extract simple text from content for bullets field
                 slide.bullets = [
-                    item.text if isinstance(item, dict) and 'text' in item else str(item) 
+                    item.text if isinstance(item, dict) and 'text' in item
+                    else str(item)
                     for item in slide.content
                 ]
-            
-            # Add automatic image fetching for content slides
-            if include_images and slide.type == 'content' and i > 0:  # Skip title slide
-                if not slide.image_url and not slide.images:
-                    logger.info(f"🖼️ Getting image for slide {i+1}: '{slide.title}'")
-                    # Use Unsplash image service to get relevant image
-                    slide.image_url = image_service.get_image_url(
-                        topic=topic,
-                        slide_title=slide.title
-                    )
-                    slide.image_position = 'right'  # Default position
-            
+
             # Add sample diagrams for process-oriented slides
-            if include_diagrams and i > 0 and any(word in slide.title.lower() for word in ['process', 'steps', 'workflow', 'method']):
+            if include_diagrams and i > 0 and _PROCESS_TITLE_RE.search(slide.title):
                 if not slide.diagram_type:
                     slide.diagram_type = 'process'
                     # Safely get bullet count with proper type checking
@@ -152,12 +444,41 @@ class PromptEngine:
                     elif slide.content and isinstance(slide.content, list):
                         bullet_count = len(slide.content)
                     slide.diagram_data = [
-                        {'step': f'Step {j+1}', 'description': f'Process step {j+1}'} 
+                        {'step': f'Step {j+1}', 'description': f'Process step {j+1}'}
                         for j in range(min(4, max(1, bullet_count)))
                     ]
-            
+
             processed_slides.append(slide)
-        
+
+        # Automatic image lookups for content slides (skipping the title slide); each is
+        # an Unsplash round trip, so resolve them concurrently
+        image_slides = [
+            (i, slide) for i, slide in enumerate(processed_slides)
+            if include_images and slide.type == 'content' and i > 0 and not (
+                slide.image_url or slide.images
+            )
+        ]
+        if image_slides:
+            def lookup(item):
+                i, slide = item
+                if early_images and i in early_images:
+                    return early_images[i].result()
+                logger.info(f"🖼️ Getting image for slide {i+1}: '{slide.title}'")
+                return image_service.get_image_url(topic=topic, slide_title=slide.title)
+            workers = min(IMAGE_LOOKUP_WORKERS, len(image_slides))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                image_urls = list(executor.map(lookup, image_slides))
+            for (_, slide), url in zip(image_slides, image_urls):
+                slide.image_url = url
+                slide.image_position = 'right'  # Default position
+
         deck.slides = processed_slides
-        logger.info(f"✅ Post-processing completed. {sum(1 for s in deck.slides if s.image_url)} slides have images")
+        with_images = sum(1 for s in deck.slides if s.image_url)
+        logger.info(f"✅ Post-processing completed. {with_images} slides have images")
         return deck
+
+
+@lru_cache(maxsize=1)
+def get_prompt_engine() -> PromptEngine:
+    """Shared PromptEngine; the LLM client and format instructions are built lazily"""
+    return PromptEngine()
@@ -1,33 +1,39 @@
 from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 class BulletPoint(BaseModel):
     text: str
     level: int = 0
-    sub_points: Optional[List[str]] = []
+    sub_points: Optional[List[str]] = Field(default_factory=list)
 
 class DiagramData(BaseModel):
+    # Not used on the generation path; build its validator on first use instead of at import
+    model_config = ConfigDict(defer_build=True)
+    
     type: str  # 'process', 'comparison', 'hierarchy'
     data: List[Dict[str, Any]]
 
 class Slide(BaseModel):
     title: str
-    bullets: List[str] = []  # Keep for backward compatibility
+    bullets: List[str] = Field(default_factory=list)  # Keep for backward compatibility
     notes: Optional[str] = None
     images: Optional[List[str]] = None  # URLs or base64
     diagrams: Optional[List[str]] = None  # Diagram descriptions or URLs
     type: Optional[str] = "content"  # 'title', 'content', 'image', 'conclusion'
     
     # Enhanced features
-    content: Optional[List[Union[str, BulletPoint]]] = []
+    content: Optional[List[Union[str, BulletPoint]]] = Field(default_factory=list)
     subtitle: Optional[str] = None
     image_url: Optional[str] = None  # Single image URL from Unsplash
     image_position: str = 'right'  # 'right', 'center', 'left'
     diagram_type: Optional[str] = None  # 'process', 'comparison', 'hierarchy'
-    diagram_data: Optional[List[Dict[str, Any]]] = []
+    diagram_data: Optional[List[Dict[str, Any]]] = Field(default_factory=list)
 
 class Deck(BaseModel):
     slides: List[Slide]
     title: Optional[str] = "Presentation"
     theme: Optional[str] = 'professional'
     total_slides: Optional[int] = None
+
+# Shared compiled validator/serializer for Deck JSON; dump_json returns bytes directly
+DECK_ADAPTER: TypeAdapter[Deck] = TypeAdapter(Deck)
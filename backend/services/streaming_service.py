@@ -1,21 +1,43 @@
 import asyncio
 import json
+import time
 import uuid
-from typing import Dict, Any, Optional, AsyncGenerator
+from collections import defaultdict, deque
+from typing import Dict, Any, Optional, AsyncGenerator, List, NamedTuple, Tuple
 from datetime import datetime
 from core.logger import get_logger
-from fastapi import Request
-from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 from threading import Lock
 
 logger = get_logger("streaming_service")
 
+# seconds of silence before an SSE comment keeps the connection alive
+HEARTBEAT_INTERVAL = 15.0
+MAX_STREAMS = 1024  # Oldest streams are evicted beyond this many
+STREAM_TTL = 30 * 60  # seconds a stream may live, connected or not
+# seconds a closed stream stays queryable before it is reaped
+CLOSED_STREAM_GRACE = 60
+REAP_INTERVAL = 60  # seconds between reaper sweeps
+# per stream; a stalled consumer loses the oldest events, not memory
+MAX_QUEUED_EVENTS = 1024
+
+
+class StreamEvent(NamedTuple):
+    """One emitted event, shared by every stream watching the job"""
+    type: str
+    timestamp: float  # time.time() at emit; format only if a consumer ever needs it
+    data: Dict[str, Any]
+    sse: str  # Pre-rendered Server-Sent Events frame
+
 class StreamingService:
     """Service for streaming real-time updates about PPT generation progress"""
     
     def __init__(self):
         self.active_streams: Dict[str, Dict[str, Any]] = {}
         self.stream_lock = Lock()
+        # job_id -> ids of connected streams watching it, so emitting doesn't scan
+        # every stream
+        self._job_streams: Dict[str, set] = defaultdict(set)
     
     def create_stream(self, job_id: str, topic: str, username: str = "anonymous") -> str:
         """Create a new streaming session for a job"""
@@ -28,53 +50,144 @@ class StreamingService:
                 "username": username,
                 "created_at": datetime.now().isoformat(),
                 "status": "initializing",
-                "events": [],
-                "connected": True
+                "events": deque(maxlen=MAX_QUEUED_EVENTS),
+                "connected": True,
+                "opened_at": time.monotonic(),
+                "closed_at": None,
+                # (loop, asyncio.Event) of the SSE consumer, set when it attaches
+                "wakeup": None
             }
+            self._job_streams[job_id].add(stream_id)
+            # Dicts keep insertion order, so the first entries are the oldest streams
+            while len(self.active_streams) > MAX_STREAMS:
+                self._drop_stream(next(iter(self.active_streams)))
         
         logger.info(f"Created stream {stream_id} for job {job_id}")
         return stream_id
     
     def emit_event(self, job_id: str, event_type: str, data: Dict[str, Any]):
         """Emit an event to all streams watching this job"""
-        event = {
-            "type": event_type,
-            "timestamp": datetime.now().isoformat(),
-            "data": data
-        }
+        self.emit_events(job_id, [(event_type, data)])
+
+    def emit_events(self, job_id: str, events: List[Tuple[str, Dict[str, Any]]]):
+        """Emit several (event_type, data) events, waking each stream once"""
+        timestamp = time.time()
+        batch = [
+            # Serialized once here rather than once per watching stream, with
+            # pydantic-core's serializer, which is faster than json.dumps and
+            # already handles datetimes
+            StreamEvent(
+                event_type, timestamp, data,
+                f"event: {event_type}\ndata: {to_json(data).decode()}\n\n",
+            )
+            for event_type, data in events
+        ]
+        if not batch:
+            return
         
         with self.stream_lock:
-            # Find all streams for this job
-            for stream_id, stream_info in self.active_streams.items():
-                if stream_info["job_id"] == job_id and stream_info["connected"]:
-                    stream_info["events"].append(event)
-                    stream_info["status"] = event_type
+            for stream_id in self._job_streams.get(job_id, ()):
+                stream_info = self.active_streams[stream_id]
+                stream_info["events"].extend(batch)
+                stream_info["status"] = batch[-1].type
+                self._notify(stream_info)
         
-        logger.info(f"Emitted event '{event_type}' for job {job_id}: {data}")
+        # Fires for every progress update; keep the payload out of INFO logs
+        for event in batch:
+            logger.debug(
+                "Emitted event '%s' for job %s: %s", event.type, job_id, event.data
+            )
     
-    def get_events(self, stream_id: str) -> list:
+    def get_events(self, stream_id: str) -> deque:
         """Get all events for a stream and clear them"""
         with self.stream_lock:
-            if stream_id in self.active_streams:
-                events = self.active_streams[stream_id]["events"].copy()
-                self.active_streams[stream_id]["events"].clear()
+            stream_info = self.active_streams.get(stream_id)
+            if stream_info is not None:
+                # Swap in a fresh buffer so the lock is held for O(1) regardless
+                # of backlog
+                events = stream_info["events"]
+                stream_info["events"] = deque(maxlen=MAX_QUEUED_EVENTS)
                 return events
-        return []
+        return deque()
     
     def close_stream(self, stream_id: str):
         """Close a streaming session"""
         with self.stream_lock:
             if stream_id in self.active_streams:
                 self.active_streams[stream_id]["connected"] = False
+                if self.active_streams[stream_id]["closed_at"] is None:
+                    self.active_streams[stream_id]["closed_at"] = time.monotonic()
+                self._unindex_stream(stream_id)
+                self._notify(self.active_streams[stream_id])
                 logger.info(f"Closed stream {stream_id}")
     
     def cleanup_stream(self, stream_id: str):
         """Remove a streaming session completely"""
         with self.stream_lock:
             if stream_id in self.active_streams:
-                del self.active_streams[stream_id]
+                self._drop_stream(stream_id)
                 logger.info(f"Cleaned up stream {stream_id}")
     
+    def reap_streams(self) -> int:
+        """Remove expired and long-closed streams; returns how many"""
+        now = time.monotonic()
+
+        def is_stale(info: Dict[str, Any]) -> bool:
+            if now - info["opened_at"] > STREAM_TTL:
+                return True
+            closed_at = info["closed_at"]
+            return closed_at is not None and now - closed_at > CLOSED_STREAM_GRACE
+
+        with self.stream_lock:
+            expired = [
+                stream_id for stream_id, info in self.active_streams.items()
+                if is_stale(info)
+            ]
+            for stream_id in expired:
+                self._drop_stream(stream_id)
+        if expired:
+            logger.info(f"Reaped {len(expired)} stale streams")
+        return len(expired)
+
+    async def run_reaper(self):
+        """Periodically reap stale streams
+
+        Clients that disconnect mid-job never call cleanup_stream.
+        """
+        while True:
+            await asyncio.sleep(REAP_INTERVAL)
+            try:
+                self.reap_streams()
+            except Exception as e:
+                logger.error(f"Stream reaper failed: {e}")
+
+    def _drop_stream(self, stream_id: str):
+        """Forget a stream, waking any consumer so it exits; caller holds stream_lock"""
+        self._unindex_stream(stream_id)
+        stream_info = self.active_streams.pop(stream_id)
+        self._notify(stream_info)
+
+    @staticmethod
+    def _notify(stream_info: Dict[str, Any]):
+        """Wake the stream's SSE consumer; safe to call from worker threads"""
+        wakeup = stream_info["wakeup"]
+        if wakeup is not None:
+            loop, event = wakeup
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Consumer's loop already shut down
+                pass
+
+    def _unindex_stream(self, stream_id: str):
+        """Stop routing job events to a stream; caller holds stream_lock"""
+        job_id = self.active_streams[stream_id]["job_id"]
+        watchers = self._job_streams.get(job_id)
+        if watchers is not None:
+            watchers.discard(stream_id)
+            if not watchers:
+                del self._job_streams[job_id]
+
     async def stream_events(self, stream_id: str) -> AsyncGenerator[str, None]:
         """Generate Server-Sent Events for a stream"""
         if stream_id not in self.active_streams:
@@ -91,6 +204,12 @@ class StreamingService:
         }
         yield f"event: connected\ndata: {json.dumps(initial_data)}\n\n"
         
+        wakeup = asyncio.Event()
+        with self.stream_lock:
+            if stream_id in self.active_streams:
+                loop = asyncio.get_running_loop()
+                self.active_streams[stream_id]["wakeup"] = (loop, wakeup)
+
         try:
             while True:
                 # Check if stream is still active
@@ -98,22 +217,40 @@ class StreamingService:
                     if stream_id not in self.active_streams or not self.active_streams[stream_id]["connected"]:
                         break
                 
-                # Get new events
+                # Get new events; clear first so an emit racing with the drain
+                # still wakes us
+                wakeup.clear()
                 events = self.get_events(stream_id)
                 
-                # Send each event
+                # Send everything queued since the last wakeup as one chunk, so a burst
+                # of progress events costs one write instead of one per event
+                frames = []
+                final_event = None
                 for event in events:
-                    event_data = json.dumps(event["data"])
-                    yield f"event: {event['type']}\ndata: {event_data}\n\n"
+                    frames.append(event.sse)
                     
                     # If this is a job_complete or error event, close the stream
-                    if event['type'] in ['job_complete', 'error']:
-                        logger.info(f"Stream {stream_id} ending due to {event['type']} event")
-                        self.close_stream(stream_id)
-                        return
+                    if event.type in ['job_complete', 'error']:
+                        final_event = event
+                        break
+                if frames:
+                    yield "".join(frames)
+                if final_event is not None:
+                    logger.info(
+                        f"Stream {stream_id} ending due to {final_event.type} event"
+                    )
+                    self.close_stream(stream_id)
+                    return
                 
-                # Wait before checking for new events
-                await asyncio.sleep(0.1)  # Reduced from 0.5 to 0.1 for faster updates
+                # Sleep until emit_event or close_stream wakes us, with a periodic
+                # heartbeat
+                if not events:
+                    try:
+                        await asyncio.wait_for(
+                            wakeup.wait(), timeout=HEARTBEAT_INTERVAL
+                        )
+                    except asyncio.TimeoutError:
+                        yield ": heartbeat\n\n"
                 
         except asyncio.CancelledError:
             logger.info(f"Stream {stream_id} cancelled by client")
@@ -0,0 +1,97 @@
+import os
+import time
+import pytest
+import services.prompt_engine as prompt_engine
+from services.prompt_engine import PromptEngine
+from services.slide_schema import Slide, Deck
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(prompt_engine, "DECK_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(prompt_engine.settings, "deck_cache_enabled", True)
+    monkeypatch.setattr(prompt_engine.settings, "deck_cache_ttl", 3600)
+    monkeypatch.setattr(prompt_engine.settings, "deck_cache_max_entries", 256)
+    prompt_engine._memory_decks.clear()
+    yield tmp_path
+    prompt_engine._memory_decks.clear()
+
+
+def make_engine():
+    # Skip __init__: the cache key only needs the model settings, not an LLM client
+    engine = PromptEngine.__new__(PromptEngine)
+    engine.model = "gemini-test"
+    engine.temperature = 0.3
+    return engine
+
+
+def make_deck(title="A"):
+    return Deck(slides=[Slide(title=title, bullets=["B"])])
+
+
+def test_cache_key_is_stable(cache):
+    engine = make_engine()
+    key = engine._deck_cache_key("Machine Learning", 8, True, True)
+    assert key == engine._deck_cache_key("Machine Learning", 8, True, True)
+    assert key == engine._deck_cache_key("  machine   LEARNING ", 8, True, True)
+    assert key != engine._deck_cache_key("Machine Learning", 6, True, True)
+    assert key != engine._deck_cache_key("Machine Learning", 8, False, True)
+    assert key != engine._deck_cache_key("Machine Learning", 8, True, False)
+
+
+def test_cache_key_disabled(cache, monkeypatch):
+    monkeypatch.setattr(prompt_engine.settings, "deck_cache_enabled", False)
+    assert make_engine()._deck_cache_key("Machine Learning", 8, True, True) is None
+
+
+def test_cached_deck_round_trip(cache):
+    prompt_engine._write_cached_deck("key", make_deck())
+    prompt_engine._memory_decks.clear()
+    deck = prompt_engine._read_cached_deck("key")
+    assert deck is not None
+    assert deck.slides[0].title == "A"
+
+
+def test_expired_entry_is_not_served(cache):
+    prompt_engine._write_cached_deck("key", make_deck())
+    prompt_engine._memory_decks.clear()
+    old = time.time() - 7200
+    os.utime(cache / "key.json", (old, old))
+    assert prompt_engine._read_cached_deck("key") is None
+
+
+def test_write_evicts_expired_entries(cache):
+    prompt_engine._write_cached_deck("stale", make_deck())
+    old = time.time() - 7200
+    os.utime(cache / "stale.json", (old, old))
+    prompt_engine._write_cached_deck("fresh", make_deck())
+    assert sorted(os.listdir(cache)) == ["fresh.json"]
+
+
+def test_prune_caps_entry_count(cache, monkeypatch):
+    now = time.time()
+    for age, key in enumerate(["newest", "middle", "oldest"]):
+        prompt_engine._write_cached_deck(key, make_deck())
+        os.utime(cache / f"{key}.json", (now - age * 10, now - age * 10))
+    monkeypatch.setattr(prompt_engine.settings, "deck_cache_max_entries", 2)
+    prompt_engine._prune_deck_cache()
+    assert sorted(os.listdir(cache)) == ["middle.json", "newest.json"]
+
+
+def test_regenerate_skips_cached_deck(cache):
+    engine = make_engine()
+    key = engine._deck_cache_key("Topic", 3, False, False)
+    prompt_engine._write_cached_deck(key, make_deck("Cached"))
+
+    class FakeLLM:
+        def invoke(self, prompt):
+            return '{"slides": [{"title": "Fresh", "bullets": ["B"]}]}'
+
+    engine.llm = FakeLLM()
+    engine.max_retries = 1
+    engine._prompt_prefix = ""
+    assert engine.generate_slides("Topic", 3, False, False).slides[0].title == "Cached"
+    deck = engine.generate_slides("Topic", 3, False, False, regenerate=True)
+    assert deck.slides[0].title == "Fresh"
+    # The fresh deck replaces the cached one
+    assert engine.generate_slides("Topic", 3, False, False).slides[0].title == "Fresh"
@@ -0,0 +1,63 @@
+import time
+from utils import file_manager
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def make_file(tmp_path, name):
+    path = tmp_path / name
+    path.write_text("x")
+    return path
+
+
+def test_worker_starts_once(tmp_path):
+    file_manager.cleanup_file(str(make_file(tmp_path, "a.pptx")), delay=0)
+    worker = file_manager._worker
+    assert worker is not None and worker.is_alive() and worker.daemon
+    file_manager.cleanup_file(str(make_file(tmp_path, "b.pptx")), delay=0)
+    assert file_manager._worker is worker
+    assert wait_until(lambda: not list(tmp_path.iterdir()))
+
+
+def test_files_are_deleted_in_deadline_order(tmp_path):
+    late = make_file(tmp_path, "late.pptx")
+    early = make_file(tmp_path, "early.pptx")
+    file_manager.cleanup_file(str(late), delay=0.6)
+    file_manager.cleanup_file(str(early), delay=0.1)
+    assert wait_until(lambda: not early.exists())
+    assert late.exists()
+    assert wait_until(lambda: not late.exists())
+
+
+def test_earlier_deadline_wakes_waiting_worker(tmp_path):
+    distant = make_file(tmp_path, "distant.pptx")
+    soon = make_file(tmp_path, "soon.pptx")
+    # The worker is now sleeping towards a deadline a minute away
+    file_manager.cleanup_file(str(distant), delay=60)
+    time.sleep(0.05)
+    file_manager.cleanup_file(str(soon), delay=0.05)
+    assert wait_until(lambda: not soon.exists(), timeout=1.0)
+    assert distant.exists()
+
+
+def test_missing_file_does_not_stop_worker(tmp_path):
+    file_manager.cleanup_file(str(tmp_path / "missing.pptx"), delay=0)
+    path = make_file(tmp_path, "after.pptx")
+    file_manager.cleanup_file(str(path), delay=0)
+    assert wait_until(lambda: not path.exists())
+    assert file_manager._worker.is_alive()
+
+
+def test_relative_path_is_resolved_when_scheduled(tmp_path, monkeypatch):
+    path = make_file(tmp_path, "relative.pptx")
+    monkeypatch.chdir(tmp_path)
+    file_manager.cleanup_file("relative.pptx", delay=0.1)
+    monkeypatch.chdir("/")
+    assert wait_until(lambda: not path.exists())
@@ -0,0 +1,58 @@
+import pytest
+from pptx import Presentation
+from pptx.util import Pt
+import services.ppt_builder as ppt_builder
+from services.ppt_builder import PPTBuilder, _fit_font_size
+from services.slide_schema import Slide, BulletPoint
+
+# The 9x5in overflow-safe box, in points
+WIDTH, HEIGHT = 648, 360
+LONG = "word " * 60
+
+
+@pytest.fixture(autouse=True)
+def average_width_measure(monkeypatch):
+    # Measure with the fallback average glyph width so sizes don't depend on the
+    # installed fonts
+    monkeypatch.setattr(ppt_builder, "_measure_font", lambda size: None)
+
+
+@pytest.mark.parametrize("items, expected", [
+    ([("Short point", 0), ("Another", 0), ("Sub point", 1)], 16),
+    ([(LONG, 0), (LONG, 1), (LONG, 1)] * 2, 14.0),
+    ([(LONG, 0), (LONG, 1), (LONG, 1)] * 3, 10.5),
+    ([(LONG, 0)] * 8, 10.0),
+    ([("x" * 5000, 0)], None),
+])
+def test_fit_font_size(items, expected):
+    assert _fit_font_size(items, WIDTH, HEIGHT) == expected
+
+
+def render_sizes(slide_data):
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    PPTBuilder()._create_overflow_safe_textbox(slide, slide_data)
+    paragraphs = slide.shapes[0].text_frame.paragraphs
+    return [(p.level, p.font.size) for p in paragraphs]
+
+
+def test_short_content_keeps_previous_sizes():
+    point = BulletPoint(text="Point", sub_points=["Detail"])
+    slide = Slide(title="T", content=[point, "Other"])
+    assert render_sizes(slide) == [(0, Pt(16)), (1, Pt(14)), (0, Pt(16))]
+
+
+def test_dense_content_shrinks_instead_of_truncating():
+    point = BulletPoint(text=LONG, sub_points=[LONG, LONG])
+    slide = Slide(title="T", content=[point] * 3)
+    sizes = render_sizes(slide)
+    assert sizes[0] == (0, Pt(10.5)) and sizes[1] == (1, Pt(8.5))
+
+
+def test_overflowing_bullets_are_truncated():
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    slide_data = Slide(title="T", bullets=["y" * 3000] * 8)
+    PPTBuilder()._create_overflow_safe_textbox(slide, slide_data)
+    paragraphs = slide.shapes[0].text_frame.paragraphs
+    assert all(len(p.text) == 150 and p.text.endswith("...") for p in paragraphs)
@@ -11,11 +11,14 @@ from core.logger import get_logger
 
 logger = get_logger("test_layout_intelligence")
 
-# Ensure NLTK downloads are available
+# Ensure NLTK downloads are available; the bundled nltk_data usually has them already
 try:
     import nltk
-    nltk.download('punkt')
-    nltk.download('stopwords')
+    for resource, path in (('punkt', 'tokenizers/punkt'), ('stopwords', 'corpora/stopwords')):
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(resource, quiet=True)
 except Exception as e:
     logger.error(f"Error downloading NLTK resources: {str(e)}")
 
@@ -86,7 +89,8 @@ def test_layout_intelligence():
         # Print results
         print("\nLayout Intelligence Results:")
         print("----------------------------")
-        print(f"Detected subject area: {layout_engine._detect_subject_area(deck)}")
+        subject_area = layout_engine._detect_subject_area(deck)
+        print(f"Detected subject area: {subject_area}")
         
         for i, slide in enumerate(processed_deck.slides):
             print(f"\nSlide {i+1}: {slide.title}")
@@ -94,7 +98,7 @@ def test_layout_intelligence():
             print(f"  - Selected layout: {slide.type}")
         
         # Test with PPTBuilder
-        theme = ThemeManager.suggest_theme_for_subject(layout_engine._detect_subject_area(deck))
+        theme = ThemeManager.suggest_theme_for_subject(subject_area)
         print(f"\nSuggested theme for this subject: {theme}")
         
         builder = PPTBuilder(theme=theme)
@@ -12,10 +12,10 @@ def test_valid_deck():
     deck = Deck(slides=[Slide(title="A", bullets=["B"])])
     assert len(deck.slides) == 1
 
-def test_invalid_slide_missing_title():
+@pytest.mark.parametrize("kwargs", [
+    {"bullets": ["A"]},  # Missing title
+    {"title": "A", "bullets": "notalist"},
+], ids=["missing_title", "bullets_type"])
+def test_invalid_slide(kwargs):
     with pytest.raises(ValidationError):
-        Slide(bullets=["A"])  # Missing title
-
-def test_invalid_slide_bullets_type():
-    with pytest.raises(ValidationError):
-        Slide(title="A", bullets="notalist")
+        Slide(**kwargs)
@@ -0,0 +1,22 @@
+from services.ppt_builder import PPTBuilder
+from services.slide_schema import Slide, Deck
+
+
+def test_metrics_not_served_for_reused_id():
+    builder = PPTBuilder()
+    short = Slide(title="T", bullets=["a"])
+    dense = Slide(title="T", bullets=["word " * 40] * 10)
+    # An entry left by another slide under the same id() must not be reused
+    builder._slide_metrics[id(dense)] = (short, builder._get_slide_metrics(short))
+    assert builder._get_slide_metrics(dense).is_dense
+    assert builder._slide_metrics[id(dense)][0] is dense
+
+
+def test_metrics_cache_released_after_build():
+    builder = PPTBuilder()
+    deck = Deck(slides=[
+        Slide(title="Title", type="title"),
+        Slide(title="T", bullets=["a", "b"]),
+    ])
+    builder.build(deck, use_template=False).close()
+    assert builder._slide_metrics == {}
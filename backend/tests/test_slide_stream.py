@@ -0,0 +1,137 @@
+import json
+from types import SimpleNamespace
+import pytest
+import services.prompt_engine as prompt_engine
+from services.prompt_engine import PromptEngine, _SlideStreamParser
+
+DECK = {
+    "slides": [
+        {"type": "title", "title": "Sets {and} braces", "subtitle": "a } b { c"},
+        {"type": "content", "title": "Quotes",
+         "bullets": ["say \"hi\" {", "back\\slash }"]},
+        {"type": "content", "title": "Nested",
+         "content": [{"text": "x", "sub_points": ["y"]}]},
+        {"type": "conclusion", "title": "End", "bullets": ["done"]},
+    ]
+}
+
+
+def feed_in_chunks(text, size):
+    parser = _SlideStreamParser()
+    slides = []
+    for i in range(0, len(text), size):
+        slides.extend(parser.feed(text[i:i + size]))
+    return parser, slides
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 10_000])
+def test_parser_yields_each_slide_once(size):
+    text = json.dumps(DECK)
+    parser, slides = feed_in_chunks(text, size)
+    assert slides == DECK["slides"]
+    assert parser.text == text
+
+
+def test_braces_and_escaped_quotes_inside_strings():
+    text = json.dumps(DECK)
+    # Cut inside the escaped quote and just after a brace in a string
+    cut = text.index('\\"hi') + 1
+    parser = _SlideStreamParser()
+    first = parser.feed(text[:cut])
+    assert [s["title"] for s in first] == ["Sets {and} braces"]
+    rest = parser.feed(text[cut:])
+    assert rest == DECK["slides"][1:]
+
+
+def test_slide_split_mid_object_is_held_back():
+    text = json.dumps(DECK)
+    cut = text.index('"Nested"')
+    parser = _SlideStreamParser()
+    assert len(parser.feed(text[:cut])) == 2
+    assert parser.feed(text[cut:cut + 5]) == []
+    assert len(parser.feed(text[cut + 5:])) == 2
+
+
+def test_pretty_printed_reply():
+    parser, slides = feed_in_chunks(json.dumps(DECK, indent=2), 5)
+    assert slides == DECK["slides"]
+
+
+def test_slides_key_split_across_chunks():
+    text = json.dumps(DECK)
+    parser = _SlideStreamParser()
+    assert parser.feed(text[:4]) == []
+    assert parser.feed(text[4:]) == DECK["slides"]
+
+
+class FakeLLM:
+    def __init__(self, text, size=9):
+        self.text = text
+        self.size = size
+
+    def stream(self, prompt):
+        for i in range(0, len(self.text), self.size):
+            yield SimpleNamespace(content=self.text[i:i + self.size])
+        yield SimpleNamespace(content="")
+
+    def invoke(self, prompt):
+        return SimpleNamespace(content=self.text)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    lookups = []
+    events = []
+
+    def get_image_url(topic, slide_title):
+        lookups.append(slide_title)
+        return f"https://img/{slide_title}"
+
+    def emit_event(job_id, event_type, data):
+        events.append((job_id, event_type, data))
+
+    monkeypatch.setattr(prompt_engine.image_service, "get_image_url", get_image_url)
+    monkeypatch.setattr(prompt_engine.streaming_service, "emit_event", emit_event)
+    monkeypatch.setattr(prompt_engine.settings, "deck_cache_enabled", False)
+    engine = PromptEngine.__new__(PromptEngine)
+    engine.llm = FakeLLM(json.dumps(DECK))
+    engine.model = "gemini-test"
+    engine.temperature = 0.3
+    engine.max_retries = 1
+    engine._prompt_prefix = ""
+    engine.lookups = lookups
+    engine.events = events
+    return engine
+
+
+def test_stream_reply_emits_slide_ready_and_starts_lookups(engine):
+    early_images = {}
+    text = engine._stream_reply("prompt", "Topic", "job-1", early_images)
+    assert text == json.dumps(DECK)
+    emitted = [
+        (job_id, event_type, data["slide_number"], data["title"])
+        for job_id, event_type, data in engine.events
+    ]
+    assert emitted == [
+        ("job-1", "slide_ready", n, slide["title"])
+        for n, slide in enumerate(DECK["slides"], 1)
+    ]
+    # Only content slides after the title get an early lookup
+    assert sorted(early_images) == [1, 2]
+    assert early_images[1].result() == "https://img/Quotes"
+
+
+def test_stream_reply_without_images_starts_no_lookups(engine):
+    engine._stream_reply("prompt", "Topic", "job-1", None)
+    assert engine.lookups == []
+
+
+def test_streamed_generation_reuses_early_lookups(engine):
+    deck = engine.generate_slides(
+        "Topic", 4, include_images=True, include_diagrams=False, job_id="job-1"
+    )
+    assert [s.image_url for s in deck.slides] == [
+        None, "https://img/Quotes", "https://img/Nested", None
+    ]
+    # Each image is looked up once, during streaming, not again in post-processing
+    assert sorted(engine.lookups) == ["Nested", "Quotes"]
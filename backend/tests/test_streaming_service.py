@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import services.streaming_service as streaming
+from services.streaming_service import StreamingService
+
+
+def collect(service, stream_id, until, timeout=2.0):
+    """Run stream_events and gather frames until one satisfies until()"""
+    async def run():
+        frames = []
+        agen = service.stream_events(stream_id)
+        try:
+            async for frame in agen:
+                frames.append(frame)
+                if until(frame):
+                    break
+        finally:
+            await agen.aclose()
+        return frames
+    return asyncio.run(asyncio.wait_for(run(), timeout))
+
+
+def test_event_emitted_from_worker_thread_is_delivered():
+    service = StreamingService()
+    stream_id = service.create_stream("job-1", "Topic")
+    worker = threading.Timer(
+        0.05, service.emit_event, ("job-1", "progress", {"step": 1})
+    )
+    worker.start()
+    frames = collect(service, stream_id, lambda frame: "progress" in frame)
+    worker.join()
+    assert frames[0].startswith("event: connected")
+    assert frames[-1] == 'event: progress\ndata: {"step":1}\n\n'
+
+
+def test_final_event_ends_and_closes_stream():
+    service = StreamingService()
+    stream_id = service.create_stream("job-1", "Topic")
+    service.emit_events(
+        "job-1", [("progress", {"step": 1}), ("job_complete", {}), ("late", {})]
+    )
+    frames = collect(service, stream_id, lambda frame: False)
+    assert frames[1] == (
+        'event: progress\ndata: {"step":1}\n\n'
+        'event: job_complete\ndata: {}\n\n'
+    )
+    assert not service.get_stream_info(stream_id)["connected"]
+
+
+def test_heartbeat_on_silence(monkeypatch):
+    monkeypatch.setattr(streaming, "HEARTBEAT_INTERVAL", 0.05)
+    service = StreamingService()
+    stream_id = service.create_stream("job-1", "Topic")
+    frames = collect(service, stream_id, lambda frame: frame.startswith(":"))
+    assert frames[-1] == ": heartbeat\n\n"
+
+
+def test_closed_stream_wakes_consumer():
+    service = StreamingService()
+    stream_id = service.create_stream("job-1", "Topic")
+    threading.Timer(0.05, service.close_stream, (stream_id,)).start()
+    frames = collect(service, stream_id, lambda frame: False)
+    assert len(frames) == 1
+
+
+def test_emit_only_reaches_streams_of_the_job():
+    service = StreamingService()
+    watching = service.create_stream("job-1", "Topic")
+    other = service.create_stream("job-2", "Topic")
+    service.emit_event("job-1", "progress", {})
+    assert [e.type for e in service.get_events(watching)] == ["progress"]
+    assert not service.get_events(other)
+
+
+def test_reap_streams(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(streaming.time, "monotonic", lambda: clock[0])
+    service = StreamingService()
+    old = service.create_stream("job-1", "Topic")
+    clock[0] += 100
+    closed = service.create_stream("job-2", "Topic")
+    live = service.create_stream("job-3", "Topic")
+    service.close_stream(closed)
+    clock[0] += streaming.CLOSED_STREAM_GRACE - 1
+    assert service.reap_streams() == 0
+    clock[0] += 2
+    assert service.reap_streams() == 1
+    assert service.get_stream_info(closed) is None
+    clock[0] = 1000.0 + streaming.STREAM_TTL + 1
+    assert service.reap_streams() == 1
+    assert service.get_stream_info(old) is None
+    assert service.get_stream_info(live) is not None
+    # Reaped streams no longer receive job events
+    assert set(service._job_streams) == {"job-3"}
+
+
+def test_oldest_streams_evicted_beyond_max(monkeypatch):
+    monkeypatch.setattr(streaming, "MAX_STREAMS", 3)
+    service = StreamingService()
+    ids = [service.create_stream(f"job-{i}", "Topic") for i in range(5)]
+    assert list(service.active_streams) == ids[2:]
+    assert set(service._job_streams) == {"job-2", "job-3", "job-4"}
+
+
+def test_queued_events_are_bounded(monkeypatch):
+    monkeypatch.setattr(streaming, "MAX_QUEUED_EVENTS", 3)
+    service = StreamingService()
+    stream_id = service.create_stream("job-1", "Topic")
+    service.emit_events("job-1", [("progress", {"step": i}) for i in range(5)])
+    assert [e.data["step"] for e in service.get_events(stream_id)] == [2, 3, 4]
@@ -1,19 +1,55 @@
 import os
 import time
+import heapq
 import threading
 
-TMP_DIR = os.path.join(os.path.dirname(__file__), '..', 'tmp')
-os.makedirs(TMP_DIR, exist_ok=True)
+# Resolved once so download paths carry no '..' component for every open() to walk
+TMP_DIR = os.path.realpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tmp')
+)
+# One stat on the common path instead of makedirs' stat, mkdir and stat
+if not os.path.isdir(TMP_DIR):
+    os.makedirs(TMP_DIR, exist_ok=True)
 
-# Delete a file after a delay (seconds)
-def cleanup_file(path: str, delay: int = 600):
-    def _delete():
-        time.sleep(delay)
+# Pending deletions as (deadline, path), serviced by one worker thread instead of a
+# sleeping thread per file
+_pending = []
+_pending_cv = threading.Condition()
+_worker = None
+
+
+def _cleanup_worker():
+    while True:
+        with _pending_cv:
+            while not _pending:
+                _pending_cv.wait()
+            deadline, path = _pending[0]
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                # Woken early if a sooner deadline is scheduled
+                _pending_cv.wait(timeout=remaining)
+                continue
+            heapq.heappop(_pending)
         try:
-            os.remove(path)
-        except Exception:
+            os.unlink(path)
+        except OSError:
             pass
-    threading.Thread(target=_delete, daemon=True).start()
+
+
+# Delete a file after a delay (seconds)
+def cleanup_file(path: str, delay: int = 600):
+    global _worker
+    # Resolve now; the working directory may differ by the time the deadline passes
+    path = os.path.abspath(path)
+    with _pending_cv:
+        heapq.heappush(_pending, (time.monotonic() + delay, path))
+        if _worker is None:
+            _worker = threading.Thread(
+                target=_cleanup_worker, name="file-cleanup", daemon=True
+            )
+            _worker.start()
+        _pending_cv.notify()
+
 
 def get_download_path(filename: str) -> str:
     return os.path.join(TMP_DIR, filename)
@@ -52,6 +52,16 @@ const progressSteps = [
   { key: 'job_complete', label: 'Complete', progress: 100 }
 ];
 
+// Status polling fallback: start fast, back off exponentially up to a cap
+const POLL_INITIAL_DELAY_MS = 250;
+const POLL_MAX_DELAY_MS = 5000;
+const POLL_TIMEOUT_MS = 10 * 60 * 1000;
+
+// Startup readiness probe: retry /health with backoff while the API may still be booting
+const HEALTH_RETRY_INITIAL_DELAY_MS = 50;
+const HEALTH_RETRY_MAX_DELAY_MS = 1000;
+const HEALTH_READY_TIMEOUT_MS = 10 * 1000;
+
 export default function PPTGenerator() {
   // State management
   const [formData, setFormData] = useState({
@@ -101,17 +111,24 @@ export default function PPTGenerator() {
     }
   }, [streamEvents]);
 
-  const checkServerHealth = async () => {
+  const checkServerHealth = async (
+    delay: number = HEALTH_RETRY_INITIAL_DELAY_MS,
+    deadline: number = Date.now() + HEALTH_READY_TIMEOUT_MS
+  ) => {
     try {
       const response = await fetch(`${API_BASE_URL}/health`);
       if (response.ok) {
         setServerStatus('online');
-      } else {
-        setServerStatus('offline');
+        return;
       }
     } catch (error) {
+      // Not reachable yet; fall through to retry
+    }
+    if (Date.now() + delay > deadline) {
       setServerStatus('offline');
+      return;
     }
+    setTimeout(() => checkServerHealth(Math.min(delay * 2, HEALTH_RETRY_MAX_DELAY_MS), deadline), delay);
   };
 
   const fetchActiveStreams = async () => {
@@ -407,7 +424,19 @@ export default function PPTGenerator() {
     }
   };
 
-  const pollJobStatus = async (jobId: string) => {
+  const pollJobStatus = async (
+    jobId: string,
+    delay: number = POLL_INITIAL_DELAY_MS,
+    deadline: number = Date.now() + POLL_TIMEOUT_MS
+  ) => {
+    const scheduleNextPoll = () => {
+      if (Date.now() + delay > deadline) {
+        addStreamEvent('polling_error', { message: 'Timed out waiting for job status' });
+        return;
+      }
+      setTimeout(() => pollJobStatus(jobId, Math.min(delay * 2, POLL_MAX_DELAY_MS), deadline), delay);
+    };
+
     try {
       const response = await fetch(`${API_BASE_URL}/status/${jobId}`);
       const data = await response.json();
@@ -436,10 +465,12 @@ export default function PPTGenerator() {
           message: `Job status: ${data.status}`,
           status: data.status 
         });
-        setTimeout(() => pollJobStatus(jobId), 2000);
+        scheduleNextPoll();
       }
     } catch (error: any) {
+      // Transient network errors back off like a pending status instead of ending the poll
       addStreamEvent('polling_error', { message: error.message });
+      scheduleNextPoll();
     }
   };
 